@@ -1,5 +1,6 @@
 """Quikvid-DL - Video downloader using yt-dlp with automatic dependency management."""
 
+import importlib.util
 import os
 import sys
 import traceback
@@ -43,20 +44,22 @@ else:
 
 print("\n [+] Checking required packages")
 
+# Locate packages without importing them; yt_dlp is imported on the first download
 while True:
-    try:
-        import yt_dlp  # noqa: F401
+    missing = [name for name in config.REQUIRED_PACKAGES if importlib.util.find_spec(name) is None]
+    if not missing:
         print(" [+] All required packages are installed")
         break
-    except ImportError as e:
-        package_name = str(e).split("'")[1] if "'" in str(e) else str(e)[17:-1]
-        inp = input(f" [!] Missing '{package_name}', do you wish to install {package_name}? (Y/n) ")
 
-        if "y" not in inp.lower() and inp != "":
-            sys.exit(1)
+    package_name = missing[0]
+    inp = input(f" [!] Missing '{package_name}', do you wish to install {package_name}? (Y/n) ")
+
+    if "y" not in inp.lower() and inp != "":
+        sys.exit(1)
 
-        pip_package = config.REQUIRED_PACKAGES.get(package_name, package_name)
-        utilities.install(pip_package)
+    pip_package = config.REQUIRED_PACKAGES[package_name]
+    utilities.install(pip_package)
+    importlib.invalidate_caches()
 
 print("\n [+] Loading Modules")
 try:
@@ -73,6 +76,7 @@ except ImportError as e:
 
 def main():
     """Main application loop."""
+    videoDownloader.setup_prompt_history()
     try:
         while True:
             utilities.clear()
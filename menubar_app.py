@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 """VidSnatch Menu Bar Application"""
+import base64
+import io
 import threading
 import time
 import subprocess
@@ -7,37 +9,82 @@ import os
 import sys
 import signal
 import platform
+import webbrowser
 from pathlib import Path
 from modules.config import UIConstants, DEFAULT_SERVER_PORT, DEFAULT_SERVER_HOST
 
 try:
     import pystray
-    from PIL import Image, ImageDraw
+    from PIL import Image
     import requests
     import setproctitle
 except ImportError:
     print("Installing required packages...")
     subprocess.run([sys.executable, "-m", "pip", "install", "pystray", "pillow", "requests", "setproctitle"])
     import pystray
-    from PIL import Image, ImageDraw
+    from PIL import Image
     import requests
     import setproctitle
 
 # PyObjC is usually pre-installed on macOS, but import it conditionally
 try:
+    import objc
     from AppKit import NSApplication, NSImage
-    from Foundation import NSBundle
+    from Foundation import NSBundle, NSObject, NSTimer
     PYOBJC_AVAILABLE = True
 except ImportError:
     PYOBJC_AVAILABLE = False
 
+IS_DARWIN = platform.system() == "Darwin"
+STATUS_CHECK_INTERVAL = 5  # seconds between server status checks
+
+# 22x22 download arrow on a dark circle, used when the extension icon is missing
+FALLBACK_ICON_PNG_B85 = (
+    b"iBL{Q4GJ0x0000DNk~Le0000M0000M2nGNE0K~LxI{*Lxm`OxIRCwC$mCX%+FbIX^#VNXki@"
+    b"1u@xQdIo1Z(I?QyVE@=}k^e;C&@6Kf}<;NDD|Q9g>fk$qlXnEf=5_D#fD}D(MgbebXZfT5?9"
+    b"KVA=Njyv~yvkH~EEtkJ7Me(<xUrO(SNK{BaA@I_?tLz_~PxCUirGQDvLF*k^obq>>@7l)#zT"
+    b"bUd@TfsBz;axe__-;Gz1Xl7wfA+OMI{*Lx07*qoM6N<$f&"
+)
+
+# Focuses an open web interface tab in a browser. The `whose` clause filters
+# tabs inside the browser in a single Apple event per window.
+TAB_SWITCH_SCRIPT = '''
+    tell application "{browser}"
+        if it is running then
+            repeat with w in windows
+                set matchingTabs to (tabs of w whose URL contains "{url}")
+                if matchingTabs is not {{}} then
+                    {select_tab}
+                    activate
+                    return true
+                end if
+            end repeat
+            return false
+        end if
+    end tell
+'''
+
+if PYOBJC_AVAILABLE:
+    class StatusTimerTarget(NSObject):
+        """NSTimer target that runs the status check on the main runloop"""
+
+        def initWithCallback_(self, callback):
+            self = objc.super(StatusTimerTarget, self).init()
+            if self is None:
+                return None
+            self.callback = callback
+            return self
+
+        def tick_(self, timer):
+            self.callback()
+
 class VidSnatchMenuBar:
     def __init__(self):
         # Set process name to "vidsnatch"
         try:
             setproctitle.setproctitle("vidsnatch")
             # Also try to set the process name for Activity Monitor
-            if platform.system() == "Darwin" and PYOBJC_AVAILABLE:
+            if IS_DARWIN and PYOBJC_AVAILABLE:
                 try:
                     app = NSApplication.sharedApplication()
                     # Set the application name
@@ -59,14 +106,23 @@ class VidSnatchMenuBar:
         self.server_running = False
         self.install_dir = os.path.expanduser("~/Applications/VidSnatch")
         
+        # Resolve the server launch paths once; check they exist up front so a
+        # broken install is reported at launch rather than on first toggle
+        self.python_path = os.path.join(self.install_dir, "venv", "bin", "python3")
+        self.server_script = os.path.join(self.install_dir, "server_only.py")
+        self.server_paths_ok = True
+        for required_path in (self.python_path, self.server_script):
+            if not os.path.exists(required_path):
+                print(f"Warning: Missing {required_path}, server cannot be started")
+                self.server_paths_ok = False
+        
         # Set up dock icon if we're on macOS
         self.setup_dock_icon()
         
     def setup_dock_icon(self):
         """Set up custom dock icon on macOS"""
         try:
-            import platform
-            if platform.system() == "Darwin" and PYOBJC_AVAILABLE:  # macOS
+            if IS_DARWIN and PYOBJC_AVAILABLE:  # macOS
                 # Try to set the dock icon using PyObjC
                 icon_path = os.path.join(self.install_dir, "chrome-extension", "icons", "icon128.png")
                 if os.path.exists(icon_path):
@@ -135,54 +191,26 @@ class VidSnatchMenuBar:
         except Exception as e:
             print(f"Could not load extension icon: {e}")
         
-        # Fallback: Create a download arrow icon similar to the extension
-        width = height = 22
-        image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(image)
-        
-        # Draw dark background circle
-        draw.ellipse([1, 1, width-1, height-1], fill=(26, 26, 26, 255))
-        
-        # Draw download arrow (simplified version of the extension icon)
-        center_x, center_y = width//2, height//2
-        
-        # Arrow shaft
-        shaft_width = 3
-        shaft_height = 8
-        draw.rectangle([
-            center_x - shaft_width//2, center_y - shaft_height//2,
-            center_x + shaft_width//2, center_y + shaft_height//2 - 2
-        ], fill=(135, 206, 235, 255))  # Sky blue like the extension
-        
-        # Arrow head
-        arrow_points = [
-            (center_x - 4, center_y + 2),
-            (center_x, center_y + 6),
-            (center_x + 4, center_y + 2)
-        ]
-        draw.polygon(arrow_points, fill=(135, 206, 235, 255))
-        
-        return image
+        # Fallback: pre-rendered download arrow icon similar to the extension
+        return Image.open(io.BytesIO(base64.b85decode(FALLBACK_ICON_PNG_B85)))
     
     def start_server(self):
         """Start the VidSnatch server"""
         if not self.server_running:
+            if not self.server_paths_ok:
+                return False
             try:
                 os.chdir(self.install_dir)
                 # Use the virtual environment python
-                python_path = os.path.join(self.install_dir, "venv", "bin", "python3")
-                server_script = os.path.join(self.install_dir, "server_only.py")
-
                 self.server_process = subprocess.Popen(
-                    [python_path, server_script],
+                    [self.python_path, self.server_script],
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL,
                     preexec_fn=os.setsid  # Create new process group
                 )
 
-                # Wait a moment and verify server actually started
-                time.sleep(2)
-                if self.check_server_status():
+                # Verify server actually started, returning as soon as it answers
+                if self.wait_for_server_status(True, timeout=5.0):
                     self.server_running = True
                     return True
                 else:
@@ -207,8 +235,6 @@ class VidSnatchMenuBar:
                     print(f"Note: Could not send stop request to server (may already be stopped): {e}")
                 
                 # Kill the process and all its children
-                import signal
-                import os
                 if self.server_process.poll() is None:  # Process still running
                     # Kill process group (parent and all children)
                     try:
@@ -252,6 +278,16 @@ class VidSnatchMenuBar:
             # Don't log this one as it happens frequently during normal operation
             return False
     
+    def wait_for_server_status(self, running, timeout):
+        """Poll until the server's running state matches, or timeout expires"""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.check_server_status() == running:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+    
     def toggle_server(self, icon, item):
         """Toggle server on/off"""
         # Check actual server status first
@@ -267,9 +303,8 @@ class VidSnatchMenuBar:
             except Exception as e:
                 print(f"Warning: Could not kill orphaned web_server.py processes: {e}")
             
-            # Wait a moment and verify server is actually stopped
-            time.sleep(0.5)
-            actual_stopped = not self.check_server_status()
+            # Verify server is actually stopped
+            actual_stopped = self.wait_for_server_status(False, timeout=2.0)
             
             # Update internal state
             self.server_running = False
@@ -294,78 +329,24 @@ class VidSnatchMenuBar:
     
     def open_web_interface(self, icon, item):
         """Open the web interface in browser with smart tab handling"""
-        import webbrowser
-        import subprocess
-        import platform
-        
         web_url = f"http://{DEFAULT_SERVER_HOST}:{DEFAULT_SERVER_PORT}"
         
         # On macOS, try to use AppleScript to find existing tabs
-        if platform.system() == "Darwin":
+        if IS_DARWIN:
             try:
                 # Try to find existing tab in common browsers and switch to it
+                tab_url = f"{DEFAULT_SERVER_HOST}:{DEFAULT_SERVER_PORT}"
                 browsers_to_check = [
-                    ("Arc", '''
-                        tell application "Arc"
-                            if it is running then
-                                set tabFound to false
-                                repeat with w in windows
-                                    repeat with t in tabs of w
-                                        if URL of t contains "{DEFAULT_SERVER_HOST}:{DEFAULT_SERVER_PORT}" then
-                                            set active tab of w to t
-                                            activate
-                                            set tabFound to true
-                                            exit repeat
-                                        end if
-                                    end repeat
-                                    if tabFound then exit repeat
-                                end repeat
-                                return tabFound
-                            end if
-                        end tell
-                    '''),
-                    ("Safari", '''
-                        tell application "Safari"
-                            if it is running then
-                                set tabFound to false
-                                repeat with w in windows
-                                    repeat with t in tabs of w
-                                        if URL of t contains "{DEFAULT_SERVER_HOST}:{DEFAULT_SERVER_PORT}" then
-                                            set current tab of w to t
-                                            activate
-                                            set tabFound to true
-                                            exit repeat
-                                        end if
-                                    end repeat
-                                    if tabFound then exit repeat
-                                end repeat
-                                return tabFound
-                            end if
-                        end tell
-                    '''),
-                    ("Google Chrome", '''
-                        tell application "Google Chrome"
-                            if it is running then
-                                set tabFound to false
-                                repeat with w in windows
-                                    repeat with t in tabs of w
-                                        if URL of t contains "{DEFAULT_SERVER_HOST}:{DEFAULT_SERVER_PORT}" then
-                                            set active tab index of w to index of t
-                                            activate
-                                            set tabFound to true
-                                            exit repeat
-                                        end if
-                                    end repeat
-                                    if tabFound then exit repeat
-                                end repeat
-                                return tabFound
-                            end if
-                        end tell
-                    ''')
+                    ("Arc", "set active tab of w to item 1 of matchingTabs"),
+                    ("Safari", "set current tab of w to item 1 of matchingTabs"),
+                    ("Google Chrome", "set active tab index of w to index of item 1 of matchingTabs"),
                 ]
                 
                 # Try each browser to find existing tab
-                for browser_name, applescript in browsers_to_check:
+                for browser_name, select_tab in browsers_to_check:
+                    applescript = TAB_SWITCH_SCRIPT.format(
+                        browser=browser_name, url=tab_url, select_tab=select_tab
+                    )
                     try:
                         result = subprocess.run(
                             ["osascript", "-e", applescript],
@@ -411,17 +392,30 @@ class VidSnatchMenuBar:
             # update_menu method might not exist in all versions of pystray
             pass
     
+    def refresh_server_status(self, icon):
+        """Check server status once and update menu if it changed"""
+        try:
+            actual_running = self.check_server_status()
+            if actual_running != self.server_running:
+                self.server_running = actual_running
+                self.update_menu(icon)
+        except Exception as e:
+            print(f"Warning: Error in periodic status check: {e}")
+
     def periodic_status_check(self, icon):
         """Periodically check server status and update menu"""
         while True:
-            time.sleep(5)  # Check every 5 seconds
-            try:
-                actual_running = self.check_server_status()
-                if actual_running != self.server_running:
-                    self.server_running = actual_running
-                    self.update_menu(icon)
-            except Exception as e:
-                print(f"Warning: Error in periodic status check: {e}")
+            time.sleep(STATUS_CHECK_INTERVAL)
+            self.refresh_server_status(icon)
+
+    def schedule_status_timer(self, icon):
+        """Schedule the status check on the main runloop (macOS only)"""
+        self.status_timer_target = StatusTimerTarget.alloc().initWithCallback_(
+            lambda: self.refresh_server_status(icon)
+        )
+        NSTimer.scheduledTimerWithTimeInterval_target_selector_userInfo_repeats_(
+            STATUS_CHECK_INTERVAL, self.status_timer_target, "tick:", None, True
+        )
     
     def run(self):
         """Run the menu bar application"""
@@ -439,11 +433,14 @@ class VidSnatchMenuBar:
         
         self.update_menu(icon)
         
-        # Start periodic status check in background
-        import threading
-        status_thread = threading.Thread(target=self.periodic_status_check, args=(icon,))
-        status_thread.daemon = True
-        status_thread.start()
+        # Start periodic status check: on macOS an NSTimer on the main runloop
+        # that pystray drives, elsewhere a background thread
+        if IS_DARWIN and PYOBJC_AVAILABLE:
+            self.schedule_status_timer(icon)
+        else:
+            status_thread = threading.Thread(target=self.periodic_status_check, args=(icon,))
+            status_thread.daemon = True
+            status_thread.start()
         
         # Handle clean shutdown
         def signal_handler(signum, frame):
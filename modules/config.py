@@ -1,6 +1,9 @@
 """Configuration constants for Quikvid-DL."""
 
 import os
+from functools import lru_cache
+from urllib.parse import urlsplit
+
 import modules.settings as settings
 
 __version__ = "2.0"
@@ -84,6 +87,7 @@ SITE_CONFIGS = {
     "pornhub.com": {
         "retries": 10,
         "sleep_interval": 3,
+        "concurrent_fragments": 4,  # CDN rate-limits parallel segment fetches
         "user_agent": (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
             "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -110,30 +114,71 @@ SITE_CONFIGS = {
     },
 }
 
+# Short links share the full site's configuration
+SITE_CONFIGS["youtu.be"] = SITE_CONFIGS["youtube.com"]
+
 # Debug settings
 DEBUG = False
 
 
+# Last resolved download path and its absolute form, keyed by the configured
+# user path so that a settings change triggers a fresh existence check
+_download_path_cache = None
+
+
+def _resolve_download_path():
+    """Return the cached (user path, download path, absolute download path)."""
+    global _download_path_cache
+    user_path = settings.get_download_path()
+    if _download_path_cache is None or _download_path_cache[0] != user_path:
+        if user_path and os.path.exists(user_path):
+            resolved_path = user_path
+        else:
+            resolved_path = os.path.join(DEFAULT_BASE_PATH, DEFAULT_VIDEO_SUBDIR)
+        _download_path_cache = (user_path, resolved_path, os.path.abspath(resolved_path))
+    return _download_path_cache
+
+
 def get_video_download_path():
     """Get the path for video downloads (user preference or default)."""
-    user_path = settings.get_download_path()
-    if user_path and os.path.exists(user_path):
-        return user_path
-    else:
-        return os.path.join(DEFAULT_BASE_PATH, DEFAULT_VIDEO_SUBDIR)
+    return _resolve_download_path()[1]
 
 
-def get_site_config(url):
-    """Get site-specific configuration for a URL."""
-    from urllib.parse import urlparse
+def get_video_download_root():
+    """Get the absolute download path, for checking that files lie inside it."""
+    return _resolve_download_path()[2]
+
 
+def get_url_hostname(url):
+    """Get the lowercased hostname of a URL, or "" if it has none."""
     try:
-        domain = urlparse(url).netloc.lower()
-        # Remove www. prefix if present
-        if domain.startswith("www."):
-            domain = domain[4:]
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+
+@lru_cache(maxsize=64)
+def get_host_domain(hostname):
+    """Get the configured site a hostname belongs to (e.g. "m.youtube.com" -> "youtube.com").
+
+    Only suffixes that are SITE_CONFIGS keys count, so unknown hosts such as
+    "www.example.co.uk" keep their full name (minus any "www.") rather than
+    collapsing to a public suffix like "co.uk".
+    """
+    labels = hostname.split(".")
+    for start in range(len(labels) - 1):
+        candidate = ".".join(labels[start:])
+        if candidate in SITE_CONFIGS:
+            return candidate
+    return hostname[4:] if hostname.startswith("www.") else hostname
 
-        return SITE_CONFIGS.get(domain, {})
-    except Exception:
-        return {}
 
+@lru_cache(maxsize=64)
+def get_site_config_for_host(hostname):
+    """Get site-specific configuration for a hostname."""
+    return SITE_CONFIGS.get(get_host_domain(hostname), {})
+
+
+def get_site_config(url):
+    """Get site-specific configuration for a URL."""
+    return get_site_config_for_host(get_url_hostname(url))
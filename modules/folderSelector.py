@@ -6,13 +6,16 @@ import platform
 import subprocess
 from pathlib import Path
 
+# platform.system() is looked up once rather than on every dialog
+IS_DARWIN = platform.system() == "Darwin"
+
 def select_download_folder():
     """
     Open a native folder selection dialog.
     Returns the selected folder path or None if cancelled.
     """
     # Try macOS AppleScript first (most reliable on macOS)
-    if platform.system() == "Darwin":
+    if IS_DARWIN:
         folder_path = _macos_folder_selection()
         if folder_path:
             return folder_path
@@ -1,11 +1,50 @@
-"""Utility functions for installer operations."""
+"""Utility functions for installer operations.
 
+All subprocess calls here pass argument lists and never use shell=True or
+preexec_fn, which keeps them on subprocess's posix_spawn fast path.
+"""
+
+import importlib.util
 import os
+import signal
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from modules.config import REQUIRED_PACKAGES
 
+IS_WINDOWS = sys.platform == 'win32'
+
+# Seconds a process gets to exit after SIGTERM before it is sent SIGKILL
+KILL_GRACE_PERIOD = 3
+
+# Info.plist for app bundles created by create_macos_app_bundle
+INFO_PLIST_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" 
+"http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<plist version="1.0">
+<dict>
+    <key>CFBundleExecutable</key>
+    <string>{app_name}</string>
+    <key>CFBundleIdentifier</key>
+    <string>{bundle_id}</string>
+    <key>CFBundleName</key>
+    <string>{app_name}</string>
+    <key>CFBundleVersion</key>
+    <string>{version}</string>
+    <key>CFBundleShortVersionString</key>
+    <string>{version}</string>
+    <key>CFBundleInfoDictionaryVersion</key>
+    <string>6.0</string>
+    <key>CFBundlePackageType</key>
+    <string>APPL</string>
+    <key>LSMinimumSystemVersion</key>
+    <string>10.9</string>
+    <key>NSHighResolutionCapable</key>
+    <true/>
+</dict>
+</plist>'''
+
 
 def get_preferred_python():
     """
@@ -66,11 +105,11 @@ def check_and_install_dependencies():
     """Check for required packages and install if missing."""
     missing_packages = []
     
+    # find_spec locates each package without executing its import-time code
     for package_import, package_install in REQUIRED_PACKAGES.items():
-        try:
-            __import__(package_import)
+        if importlib.util.find_spec(package_import) is not None:
             print(f" [+] {package_import} is already installed")
-        except ImportError:
+        else:
             missing_packages.append((package_import, package_install))
     
     if not missing_packages:
@@ -80,32 +119,33 @@ def check_and_install_dependencies():
     print(f" [!] Missing packages: {[pkg[1] for pkg in missing_packages]}")
     print(" [+] Installing missing packages...")
     
-    for package_import, package_install in missing_packages:
-        try:
-            print(f" [+] Installing {package_install}...")
-            result = subprocess.run([
-                sys.executable, '-m', 'pip', 'install', package_install
-            ], capture_output=True, text=True, timeout=300)
-            
-            if result.returncode == 0:
-                print(f" [+] Successfully installed {package_install}")
-            else:
-                print(f" [!] Failed to install {package_install}")
-                print(f"     Error: {result.stderr}")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            print(f" [!] Timeout installing {package_install}")
-            return False
-        except Exception as e:
-            print(f" [!] Error installing {package_install}: {e}")
+    # Install everything in one pip call so the resolver fetches metadata
+    # for all packages in a single pass
+    package_names = [package_install for _, package_install in missing_packages]
+    try:
+        print(f" [+] Installing {', '.join(package_names)}...")
+        result = subprocess.run([
+            sys.executable, '-m', 'pip', 'install', *package_names
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=300)
+        
+        if result.returncode == 0:
+            print(f" [+] Successfully installed {', '.join(package_names)}")
+        else:
+            print(f" [!] Failed to install {', '.join(package_names)}")
+            print(f"     Error: {result.stderr}")
             return False
+            
+    except subprocess.TimeoutExpired:
+        print(f" [!] Timeout installing {', '.join(package_names)}")
+        return False
+    except Exception as e:
+        print(f" [!] Error installing {', '.join(package_names)}: {e}")
+        return False
     
-    # Verify installation
+    # Verify installation (clear finder caches so new packages are seen)
+    importlib.invalidate_caches()
     for package_import, _ in missing_packages:
-        try:
-            __import__(package_import)
-        except ImportError:
+        if importlib.util.find_spec(package_import) is None:
             print(f" [!] Failed to verify installation of {package_import}")
             return False
     
@@ -113,43 +153,65 @@ def check_and_install_dependencies():
     return True
 
 
+def _find_pids(pattern, timeout=10):
+    """Return the PIDs of processes whose command line matches a pattern."""
+    try:
+        result = subprocess.run(
+            ['pgrep', '-f', pattern],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    except Exception:
+        return []
+    
+    if result.returncode != 0:
+        return []
+    return result.stdout.splitlines()
+
+
+def _find_pids_concurrently(patterns, timeout=10):
+    """Run pgrep for every pattern in parallel, returning PID lists in order."""
+    with ThreadPoolExecutor(max_workers=max(1, len(patterns))) as executor:
+        return list(executor.map(lambda pattern: _find_pids(pattern, timeout), patterns))
+
+
+def _is_running(pid):
+    """Return whether a process with this PID still exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists but belongs to another user
+    return True
+
+
 def kill_processes_by_pattern(patterns):
     """Kill processes matching the given patterns."""
     killed_processes = []
+    patterns = list(patterns)
     
-    for pattern in patterns:
+    for pattern, pids in zip(patterns, _find_pids_concurrently(patterns)):
+        for pid in pids:
+            try:
+                os.kill(int(pid), signal.SIGTERM)
+                killed_processes.append((pattern, pid))
+            except OSError:
+                pass  # Already exited, or not ours to signal
+    
+    # Force kill anything that ignored TERM for the whole grace period
+    survivors = [int(pid) for _, pid in killed_processes]
+    deadline = time.monotonic() + KILL_GRACE_PERIOD
+    while survivors:
+        survivors = [pid for pid in survivors if _is_running(pid)]
+        if not survivors or time.monotonic() >= deadline:
+            break
+        time.sleep(0.1)
+    for pid in survivors:
         try:
-            # Use pgrep to find processes
-            result = subprocess.run(
-                ['pgrep', '-f', pattern],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                pids = result.stdout.strip().split('\n')
-                for pid in pids:
-                    if pid:
-                        try:
-                            subprocess.run(
-                                ['kill', '-TERM', pid],
-                                timeout=5
-                            )
-                            killed_processes.append((pattern, pid))
-                        except subprocess.TimeoutExpired:
-                            # Force kill if TERM doesn't work
-                            try:
-                                subprocess.run(
-                                    ['kill', '-KILL', pid],
-                                    timeout=5
-                                )
-                                killed_processes.append((pattern, pid))
-                            except Exception:
-                                pass
-                        except Exception:
-                            pass
-        except Exception:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
             pass
     
     if killed_processes:
@@ -203,26 +265,27 @@ def install_requirements_in_venv(venv_path, requirements_file):
         print(f" [!] Requirements file not found: {requirements_file}")
         return False
     
-    # Get the pip path in the virtual environment
-    if sys.platform == 'win32':
-        pip_path = os.path.join(venv_path, 'Scripts', 'pip')
-        python_path = os.path.join(venv_path, 'Scripts', 'python')
-    else:
-        pip_path = os.path.join(venv_path, 'bin', 'pip')
-        python_path = os.path.join(venv_path, 'bin', 'python')
+    # Locate the venv interpreter with one directory listing before spawning
+    bin_dir = os.path.join(venv_path, 'Scripts' if IS_WINDOWS else 'bin')
+    python_name = 'python.exe' if IS_WINDOWS else 'python'
+    try:
+        with os.scandir(bin_dir) as it:
+            entries = {entry.name for entry in it}
+    except OSError:
+        entries = set()
+    
+    if python_name not in entries:
+        print(f" [!] Python interpreter not found in virtual environment: {bin_dir}")
+        return False
+    python_path = os.path.join(bin_dir, python_name)
     
     try:
-        # Upgrade pip first
-        print(" [+] Upgrading pip...")
-        subprocess.run([
-            python_path, '-m', 'pip', 'install', '--upgrade', 'pip'
-        ], capture_output=True, timeout=120)
-        
-        # Install requirements
-        print(f" [+] Installing requirements from {requirements_file}...")
+        # Upgrade pip and install requirements in a single pip run
+        print(f" [+] Upgrading pip and installing requirements from {requirements_file}...")
         result = subprocess.run([
-            pip_path, 'install', '-r', requirements_file
-        ], capture_output=True, text=True, timeout=300)
+            python_path, '-m', 'pip', 'install', '--upgrade', 'pip',
+            '-r', requirements_file
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=300)
         
         if result.returncode == 0:
             print(" [+] Requirements installed successfully")
@@ -239,6 +302,23 @@ def install_requirements_in_venv(venv_path, requirements_file):
         return False
 
 
+def _write_file(path, content, mode=None):
+    """Write text to a file with unbuffered writes, then set its mode if given.
+
+    The mode is applied with fchmod because os.open's mode only affects new
+    files and is masked by the umask.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        data = memoryview(content.encode('utf-8'))
+        while data:
+            data = data[os.write(fd, data):]
+        if mode is not None:
+            os.fchmod(fd, mode)
+    finally:
+        os.close(fd)
+
+
 def create_macos_app_bundle(app_path, app_name, executable_content,
                            bundle_id=None, version="1.0"):
     """Create a macOS app bundle."""
@@ -253,41 +333,16 @@ def create_macos_app_bundle(app_path, app_name, executable_content,
         
         # Create executable
         executable_path = os.path.join(macos_dir, app_name)
-        with open(executable_path, 'w') as f:
-            f.write(executable_content)
-        os.chmod(executable_path, 0o755)
+        _write_file(executable_path, executable_content, mode=0o755)
         
         # Create Info.plist
         bundle_id = bundle_id or f"com.vidsnatch.{app_name.lower()}"
-        info_plist = f'''<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" 
-"http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-    <key>CFBundleExecutable</key>
-    <string>{app_name}</string>
-    <key>CFBundleIdentifier</key>
-    <string>{bundle_id}</string>
-    <key>CFBundleName</key>
-    <string>{app_name}</string>
-    <key>CFBundleVersion</key>
-    <string>{version}</string>
-    <key>CFBundleShortVersionString</key>
-    <string>{version}</string>
-    <key>CFBundleInfoDictionaryVersion</key>
-    <string>6.0</string>
-    <key>CFBundlePackageType</key>
-    <string>APPL</string>
-    <key>LSMinimumSystemVersion</key>
-    <string>10.9</string>
-    <key>NSHighResolutionCapable</key>
-    <true/>
-</dict>
-</plist>'''
+        info_plist = INFO_PLIST_TEMPLATE.format(
+            app_name=app_name, bundle_id=bundle_id, version=version
+        )
         
         info_plist_path = os.path.join(contents_dir, "Info.plist")
-        with open(info_plist_path, 'w') as f:
-            f.write(info_plist)
+        _write_file(info_plist_path, info_plist)
         
         print(f" [+] Created app bundle: {app_path}")
         return True
@@ -300,22 +355,16 @@ def create_macos_app_bundle(app_path, app_name, executable_content,
 def wait_for_process_completion(process_names, timeout=30):
     """Wait for specific processes to complete or timeout."""
     start_time = time.time()
+    process_names = list(process_names)
     
     while time.time() - start_time < timeout:
-        still_running = []
-        
-        for process_name in process_names:
-            try:
-                result = subprocess.run(
-                    ['pgrep', '-f', process_name],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    still_running.append(process_name)
-            except Exception:
-                pass
+        still_running = [
+            process_name
+            for process_name, pids in zip(
+                process_names, _find_pids_concurrently(process_names, timeout=5)
+            )
+            if pids
+        ]
         
         if not still_running:
             print(" [+] All processes completed")
@@ -1,5 +1,15 @@
 """ASCII art logo for VidSnatch with Mercury symbolism."""
 
+import re
+from functools import lru_cache
+
+# Words that get colored; single characters are handled by str.translate
+_LOGO_WORD_PATTERN = re.compile(r'VidSnatch|Download|Videos')
+
+# Colorized startup logo, built on first use
+_colored_logo = None
+
+@lru_cache(maxsize=1)
 def get_ascii_logo():
     """Return ASCII art logo representing the download arrow design.
     
@@ -40,6 +50,7 @@ def get_ascii_logo():
     
     """
 
+@lru_cache(maxsize=1)
 def get_compact_logo():
     """Return a compact ASCII logo for smaller displays."""
     return """
@@ -55,25 +66,38 @@ def get_compact_logo():
 
 def print_startup_logo():
     """Print the startup logo with color if available."""
+    global _colored_logo
     try:
         # Try to use colors if available
         import colorama
         from colorama import Fore, Style
         colorama.init()
         
+        if _colored_logo is not None:
+            print(_colored_logo)
+            return
+        
         logo = get_ascii_logo()
         # Color the logo with download arrow theme (blue to orange gradient)
-        colored_logo = logo.replace('▲', f'{Fore.CYAN}▲{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('▼', f'{Fore.YELLOW}▼{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('█', f'{Fore.BLUE}█{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('▓', f'{Fore.CYAN}▓{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('▒', f'{Fore.WHITE}▒{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('░', f'{Fore.WHITE}░{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('⚠', f'{Fore.YELLOW}{Style.BRIGHT}⚠{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('☿', f'{Fore.MAGENTA}{Style.BRIGHT}☿{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('VidSnatch', f'{Fore.BLUE}{Style.BRIGHT}VidSnatch{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('Download', f'{Fore.CYAN}Download{Style.RESET_ALL}')
-        colored_logo = colored_logo.replace('Videos', f'{Fore.CYAN}Videos{Style.RESET_ALL}')
+        char_colors = str.maketrans({
+            '▲': f'{Fore.CYAN}▲{Style.RESET_ALL}',
+            '▼': f'{Fore.YELLOW}▼{Style.RESET_ALL}',
+            '█': f'{Fore.BLUE}█{Style.RESET_ALL}',
+            '▓': f'{Fore.CYAN}▓{Style.RESET_ALL}',
+            '▒': f'{Fore.WHITE}▒{Style.RESET_ALL}',
+            '░': f'{Fore.WHITE}░{Style.RESET_ALL}',
+            '⚠': f'{Fore.YELLOW}{Style.BRIGHT}⚠{Style.RESET_ALL}',
+            '☿': f'{Fore.MAGENTA}{Style.BRIGHT}☿{Style.RESET_ALL}',
+        })
+        word_colors = {
+            'VidSnatch': f'{Fore.BLUE}{Style.BRIGHT}VidSnatch{Style.RESET_ALL}',
+            'Download': f'{Fore.CYAN}Download{Style.RESET_ALL}',
+            'Videos': f'{Fore.CYAN}Videos{Style.RESET_ALL}',
+        }
+        colored_logo = _LOGO_WORD_PATTERN.sub(
+            lambda match: word_colors[match.group(0)], logo.translate(char_colors)
+        )
+        _colored_logo = colored_logo
         print(colored_logo)
     except ImportError:
         # Fall back to plain ASCII if colorama not available
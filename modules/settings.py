@@ -1,9 +1,10 @@
 """Settings management for Quikvid-DL."""
 
 import json
-import os
 from pathlib import Path
 
+import modules.utilities as utilities
+
 class Settings:
     """Manages user settings and preferences."""
     
@@ -12,13 +13,14 @@ class Settings:
         self.settings_dir = Path.home() / ".quikvid-dl"
         self.settings_file = self.settings_dir / "settings.json"
         self.settings = self._load_settings()
+        self._dirty = False
     
     def _load_settings(self):
         """Load settings from file or create default settings."""
         if self.settings_file.exists():
             try:
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.settings_file, 'rb') as f:
+                    return utilities.json_loads(f.read())
             except (json.JSONDecodeError, IOError):
                 return self._get_default_settings()
         else:
@@ -32,11 +34,13 @@ class Settings:
         }
     
     def save_settings(self):
-        """Save current settings to file."""
+        """Save current settings to file if they have changed."""
+        if not self._dirty:
+            return
         try:
             self.settings_dir.mkdir(exist_ok=True)
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2)
+            utilities.atomic_write(self.settings_file, utilities.json_dumps(self.settings))
+            self._dirty = False
         except IOError as e:
             print(f" [!] Warning: Could not save settings - {e}")
     
@@ -46,8 +50,11 @@ class Settings:
     
     def set_download_path(self, path):
         """Set the user's preferred download path."""
-        self.settings["download_path"] = str(path)
-        self.settings["first_run"] = False
+        path = str(path)
+        if self.settings.get("download_path") != path or self.settings.get("first_run", True):
+            self.settings["download_path"] = path
+            self.settings["first_run"] = False
+            self._dirty = True
         self.save_settings()
     
     def is_first_run(self):
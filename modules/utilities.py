@@ -1,12 +1,137 @@
 """Utility functions for the video downloader application."""
 
+import json
 import os
+import re
 import subprocess
 import sys
+from datetime import datetime
+
+try:
+    # Optional: parses and serialises several times faster than json
+    import orjson
+except ImportError:
+    orjson = None
+
+# Placeholder prefixes stripped from titles, stored lowercased for matching
+_PLACEHOLDER_PREFIXES = (
+    'undefined - ',
+    'null - ',
+    '[object object] - ',
+    'untitled - ',
+)
+
+# Uploader prefixes: one or more words followed by " - " and substantial content
+_UPLOADER_PATTERN = re.compile(r'^([A-Za-z0-9_]+(?:\s+[A-Za-z0-9_]+)*)\s*-\s*(.{10,})$')
+
+# Substrings suggesting the "uploader" is really a descriptive part of the title
+_DESCRIPTIVE_WORDS = ('and', 'the', 'with', 'for', 'on', 'in')
+
+_LEADING_DASH_PATTERN = re.compile(r'^-\s*')
+_TRAILING_DASH_PATTERN = re.compile(r'\s*-$')
+
+# Whether the console understands ANSI escapes; decided on the first clear()
+_ansi_clear = None
+
+def _enable_windows_vt():
+    """Turn on ANSI escape processing for the Windows console."""
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (AttributeError, OSError):
+        return False
 
 def clear():
     """Clear the terminal screen."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    global _ansi_clear
+    if _ansi_clear is None:
+        _ansi_clear = os.name != 'nt' or _enable_windows_vt()
+    
+    if _ansi_clear:
+        # Erase the screen and home the cursor without spawning a process
+        sys.stdout.write('\x1b[2J\x1b[H')
+        sys.stdout.flush()
+    else:
+        subprocess.run(['cmd', '/c', 'cls'])
+
+def json_loads(data):
+    """Parse JSON from bytes or str, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj, indent=True, default=None):
+    """Serialise obj as UTF-8 JSON bytes, using orjson when it is installed.
+
+    default is called for objects JSON can't encode and returns a substitute.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 if indent else None)
+
+    def fallback_default(value):
+        # orjson writes datetimes natively as RFC 3339; match it
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if default is not None:
+            return default(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    return json.dumps(obj, indent=2 if indent else None, default=fallback_default).encode('utf-8')
+
+def atomic_write(path, data):
+    """Write bytes to path via a temp file renamed into place.
+
+    Readers and crashes never see a half-written file. There is no fsync:
+    these are logs and caches that can afford to lose the latest write.
+    """
+    tmp_file = os.fspath(path) + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+
+# Key of the change-log header line and of the matching field in its snapshot
+LOG_GENERATION_KEY = 'log_generation'
+
+def change_log_header(generation):
+    """Return the first line of a change log that patches the given snapshot generation."""
+    return json_dumps({LOG_GENERATION_KEY: generation}, indent=False) + b'\n'
+
+def reset_change_log(log_file, generation):
+    """Replace a change log with an empty one for the given snapshot generation."""
+    atomic_write(log_file, change_log_header(generation))
+
+def read_change_log(log_file, generation):
+    """Read the records of the change log patching a snapshot of the given generation.
+
+    A log whose header names another generation was left behind by a crash
+    between writing a snapshot and resetting the log. Every record in it is
+    already covered by the snapshot, so None is returned and nothing is
+    replayed. Files from before generations existed have neither a header
+    nor a snapshot generation, so they still match.
+    """
+    if not os.path.exists(log_file):
+        return []
+    records = []
+    log_generation = None
+    with open(log_file, 'rb') as f:
+        for index, line in enumerate(f):
+            try:
+                record = json_loads(line)
+            except ValueError:
+                break  # Torn final line from an interrupted append
+            if index == 0 and LOG_GENERATION_KEY in record:
+                log_generation = record[LOG_GENERATION_KEY]
+                continue
+            records.append(record)
+    if (records or log_generation is not None) and log_generation != generation:
+        return None
+    return records
 
 def install(package):
     """Install a Python package using pip."""
@@ -23,33 +148,28 @@ def clean_video_title(title):
     """
     if not title:
         return title
+    
+    # Every rule below needs a dash or surrounding whitespace; skip the rest without them
+    if '-' not in title and title.strip() == title:
+        return title
         
     # Remove "NA - " prefix (case-insensitive)
-    if title.lower().startswith('na - '):
+    title_lower = title.lower()
+    if title_lower.startswith('na - '):
         title = title[5:]  # Remove the first 5 characters "NA - "
+        title_lower = title_lower[5:]
     
-    # Remove other common unwanted prefixes
-    prefixes_to_remove = [
-        'undefined - ',
-        'null - ',
-        '[object Object] - ',
-        'untitled - ',
-    ]
-    
-    title_lower = title.lower()
-    for prefix in prefixes_to_remove:
-        if title_lower.startswith(prefix.lower()):
-            title = title[len(prefix):]
-            break
+    # Remove other common unwanted prefixes; one tuple startswith rules them
+    # all out before looking for the one that matched
+    if title_lower.startswith(_PLACEHOLDER_PREFIXES):
+        for prefix in _PLACEHOLDER_PREFIXES:
+            if title_lower.startswith(prefix):
+                title = title[len(prefix):]
+                break
     
     # Remove uploader/channel name prefixes (common pattern: "ChannelName - ActualTitle")
-    # Look for patterns like "Word - " or "Word1Word2 - " at the beginning
-    import re
-    
-    # Pattern to match uploader prefixes: one or more words followed by " - "
     # Only remove if there's substantial content after the " - "
-    uploader_pattern = r'^([A-Za-z0-9_]+(?:\s+[A-Za-z0-9_]+)*)\s*-\s*(.{10,})$'
-    match = re.match(uploader_pattern, title)
+    match = _UPLOADER_PATTERN.match(title)
     
     if match:
         uploader_name = match.group(1)
@@ -60,15 +180,15 @@ def clean_video_title(title):
         # 2. The uploader name looks like a channel name (not part of the title)
         if (len(actual_title) >= 10 and 
             len(uploader_name) <= 20 and  # Reasonable uploader name length
-            not any(word in uploader_name.lower() for word in ['and', 'the', 'with', 'for', 'on', 'in'])):  # Avoid removing descriptive parts
+            not any(word in uploader_name.lower() for word in _DESCRIPTIVE_WORDS)):  # Avoid removing descriptive parts
             title = actual_title
     
     # Clean up any leading/trailing whitespace
     title = title.strip()
     
     # Remove any trailing " - " or leading "- "
-    title = re.sub(r'^-\s*', '', title)
-    title = re.sub(r'\s*-$', '', title)
+    title = _LEADING_DASH_PATTERN.sub('', title)
+    title = _TRAILING_DASH_PATTERN.sub('', title)
     
     # If title is empty after cleaning, return a default
     if not title:
@@ -1,19 +1,188 @@
 """Video downloader module using yt-dlp."""
 
+import atexit
+import contextlib
 import os
+import re
+import shutil
 import sys
 import subprocess
-
-import yt_dlp
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import modules.utilities as utilities
 import modules.config as config
 import modules.settings as settings
 import modules.folderSelector as folderSelector
-from modules.config import get_site_config
+from modules.config import get_host_domain, get_site_config_for_host, get_url_hostname
+
+# Prompt history shared across sessions
+HISTORY_FILE = os.path.expanduser(os.path.join('~', '.quikvid-dl', 'history'))
+
+def setup_prompt_history():
+    """Load the CLI prompt history and save it on exit.
+
+    Called once by the interactive entry point, so the web server, which
+    also imports this module, never touches the history file.
+    """
+    try:
+        # Gives input() line editing and history recall where available
+        import readline
+    except ImportError:
+        return
+
+    readline.set_history_length(200)
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+
+    def _save_history():
+        """Persist the prompt history, ignoring an unwritable location."""
+        try:
+            os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+            readline.write_history_file(HISTORY_FILE)
+        except OSError:
+            pass
+
+    atexit.register(_save_history)
+
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
+    'AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/131.0.0.0 Safari/537.36'
+)
+
+# Request headers sent with every download (User-Agent is set per site)
+BASE_HTTP_HEADERS = {
+    'Accept': ('text/html,application/xhtml+xml,application/xml;'
+              'q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8'),
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# One case-insensitive scan of the error text finds every kind of error it
+# mentions. The age check only consumes one word so it can't swallow others
+DOWNLOAD_ERROR_PATTERN = re.compile(
+    r'(?P<unsupported>unsupported url|no video formats found)'
+    r'|(?P<unavailable>video unavailable|private video)'
+    r'|(?P<age_restricted>age(?=.*restricted)|restricted(?=.*age))',
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Checked in order: when an error mentions several kinds, the first one wins
+DOWNLOAD_ERROR_MESSAGES = {
+    'unsupported': " [!] Error: This URL is not supported or no video was found at this link",
+    'unavailable': " [!] Error: This video is unavailable, private, or has been removed",
+    'age_restricted': " [!] Error: This video is age-restricted and cannot be downloaded",
+}
+
+# yt-dlp options shared by every download; copied and extended per call
+BASE_YDL_OPTS = {
+    'socket_timeout': 180,
+    'file_access_retries': 3,
+    'concurrent_fragment_downloads': 8,  # Parallel HLS/DASH segment fetches
+    'http_chunk_size': 10485760,  # 10MB ranges for direct HTTP downloads
+    'external_downloader_args': {
+        'default': ['--retry-connrefused', '--retry', '5', '--timeout', '300']
+    },
+}
+
+# aria2c fetches each file over many parallel connections; use it when installed
+if shutil.which('aria2c'):
+    BASE_YDL_OPTS['external_downloader'] = {'default': 'aria2c'}
+    BASE_YDL_OPTS['external_downloader_args']['aria2c'] = [
+        '-x', '16', '-s', '16', '-k', '1M', '--retry-wait=5', '--max-tries=5'
+    ]
+
+# Direct MP4 links in an Eporner page (src=, video_url=, "file": ...), scanned in one pass
+EPORNER_MP4_PATTERN = re.compile(
+    r'(?:src\s*=\s*["\']|video_url\s*=\s*["\']|"file"\s*:\s*")'
+    r'(?P<url>[^"\']*\.mp4[^"\']*)["\']',
+    re.IGNORECASE,
+)
+
+# Keeps progress lines whole when several downloads run at once
+_print_lock = threading.Lock()
+
+def _print(message):
+    """Print a status line without it interleaving with other downloads' output."""
+    with _print_lock:
+        sys.stdout.write(message + '\n')
+
+# Shared keep-alive client for the manual page-scraping fallbacks: httpx with
+# HTTP/2 when it is installed, otherwise a pooled requests session
+_http_client = None
+_http_client_is_httpx = False
+
+FALLBACK_HTTP_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+def _get_http_client():
+    """Return the pooled HTTP client, creating it on first use."""
+    global _http_client, _http_client_is_httpx
+    if _http_client is None:
+        try:
+            import httpx
+            # Raises ImportError when the h2 extra is not installed
+            _http_client = httpx.Client(
+                http2=True,
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                headers=FALLBACK_HTTP_HEADERS,
+                follow_redirects=True,
+            )
+            _http_client_is_httpx = True
+        except ImportError:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+            ))
+            session.headers.update(FALLBACK_HTTP_HEADERS)
+            _http_client = session
+    return _http_client
+
+@contextlib.contextmanager
+def _stream_page(url, headers, chunk_size=65536):
+    """Open a page and yield an iterator over its body in byte chunks."""
+    client = _get_http_client()
+    if _http_client_is_httpx:
+        with client.stream('GET', url, headers=headers) as response:
+            yield response.iter_bytes(chunk_size)
+    else:
+        with client.get(url, headers=headers, timeout=(5, 30), stream=True) as response:
+            yield response.iter_content(chunk_size)
+
+def fetch_page_text(url, headers):
+    """Download a whole page and decode it as UTF-8."""
+    with _stream_page(url, headers) as chunks:
+        return b''.join(chunks).decode('utf-8', 'replace')
+
+def _search_page(url, headers, pattern, overlap=4096):
+    """Search a page chunk by chunk as it downloads, stopping at the first match."""
+    with _stream_page(url, headers) as chunks:
+        text = ''
+        for chunk in chunks:
+            # Carry the tail of the previous chunk so matches spanning a boundary are found
+            text = text[-overlap:] + chunk.decode('utf-8', 'ignore')
+            match = pattern.search(text)
+            if match:
+                return match
+    return None
 
 def download_video(url, download_path):
     """Download a video from the given URL."""
+    # Imported here so the CLI starts without paying yt-dlp's import cost
+    import yt_dlp
     
     def clean_title_hook(d):
         """Hook to clean video title during extraction."""
@@ -21,41 +190,38 @@ def download_video(url, download_path):
             # Clean title for display
             if 'title' in d.get('info_dict', {}):
                 cleaned_title = utilities.clean_video_title(d['info_dict']['title'])
-                print(f" [+] Downloaded: {cleaned_title}")
+                # One write per line, without a flush; main() flushes per URL
+                with _print_lock:
+                    sys.stdout.write(f" [+] Downloaded: {cleaned_title}\n")
     
     # Get site-specific configuration
-    site_config = get_site_config(url)
+    hostname = get_url_hostname(url)
+    site_domain = get_host_domain(hostname)
+    site_config = get_site_config_for_host(hostname)
     
     # Base configuration
     ydl_opts = {
+        **BASE_YDL_OPTS,
         'outtmpl': os.path.join(
             download_path, 
             site_config.get('output_template', config.DEFAULT_OUTPUT_TEMPLATE)
         ),
-        'socket_timeout': 180,
         'retries': site_config.get('retries', 5),
         'fragment_retries': site_config.get('retries', 5),
-        'file_access_retries': 3,
         'progress_hooks': [clean_title_hook],
         'http_headers': {
-            'User-Agent': site_config.get(
-                'user_agent',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-                'AppleWebKit/537.36 (KHTML, like Gecko) '
-                'Chrome/131.0.0.0 Safari/537.36'
-            ),
-            'Accept': ('text/html,application/xhtml+xml,application/xml;'
-                      'q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8'),
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
+            'User-Agent': site_config.get('user_agent', DEFAULT_USER_AGENT),
+            **BASE_HTTP_HEADERS,
         },
-        'external_downloader_args': {
-            'default': ['--retry-connrefused', '--retry', '5', '--timeout', '300']
-        }
     }
     
+    # Apply site-specific fragment concurrency if configured; a value of 1
+    # opts a fragile site out of parallel fetching, including aria2c
+    if 'concurrent_fragments' in site_config:
+        ydl_opts['concurrent_fragment_downloads'] = site_config['concurrent_fragments']
+        if site_config['concurrent_fragments'] <= 1:
+            ydl_opts.pop('external_downloader', None)
+    
     # Apply site-specific sleep interval if configured
     if 'sleep_interval' in site_config:
         ydl_opts['sleep_interval_requests'] = site_config['sleep_interval']
@@ -78,7 +244,8 @@ def download_video(url, download_path):
                     cleaned_title = utilities.clean_video_title(original_title)
                     info['title'] = cleaned_title
                     if original_title != cleaned_title:
-                        print(f" [+] Cleaned title: '{original_title}' → '{cleaned_title}'")
+                        with _print_lock:
+                            sys.stdout.write(f" [+] Cleaned title: '{original_title}' → '{cleaned_title}'\n")
                 return [], info
         
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -88,20 +255,13 @@ def download_video(url, download_path):
         return True
     except (yt_dlp.DownloadError, AttributeError) as e:
         # Try manual extraction for XHamster if the built-in extractor fails
-        if 'xhamster.com' in url and ('unable to download video data' in str(e).lower() or 'unable to extract title' in str(e).lower() or isinstance(e, AttributeError)):
-            print(f" [+] Attempting manual XHamster extraction...")
+        if site_domain == 'xhamster.com' and ('unable to download video data' in str(e).lower() or 'unable to extract title' in str(e).lower() or isinstance(e, AttributeError)):
+            _print(f" [+] Attempting manual XHamster extraction...")
             try:
-                import requests
-                import re
-                
                 # Get page content
-                response = requests.get(url, 
-                    headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.9',
-                    },
-                    timeout=30)
+                page_text = fetch_page_text(url, {
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+                })
                 
                 # Extract M3U8 video URL patterns from XHamster
                 m3u8_patterns = [
@@ -112,7 +272,7 @@ def download_video(url, download_path):
                 
                 video_url = None
                 for pattern in m3u8_patterns:
-                    matches = re.findall(pattern, response.text, re.IGNORECASE)
+                    matches = re.findall(pattern, page_text, re.IGNORECASE)
                     if matches:
                         video_url = matches[0] if isinstance(matches[0], str) else matches[0]
                         # Ensure URL is properly formatted
@@ -121,7 +281,7 @@ def download_video(url, download_path):
                         break
                 
                 # Extract title from page
-                title_match = re.search(r'<title[^>]*>([^<]+)</title>', response.text, re.IGNORECASE)
+                title_match = re.search(r'<title[^>]*>([^<]+)</title>', page_text, re.IGNORECASE)
                 video_title = "XHamster_Video"
                 if title_match:
                     title = title_match.group(1)
@@ -129,7 +289,7 @@ def download_video(url, download_path):
                     video_title = utilities.clean_video_title(title.split(' - ')[0])
                 
                 if video_url:
-                    print(f" [+] Found direct M3U8 URL, downloading...")
+                    _print(f" [+] Found direct M3U8 URL, downloading...")
                     
                     # Create options for M3U8 download
                     direct_opts = {
@@ -143,43 +303,26 @@ def download_video(url, download_path):
                     with yt_dlp.YoutubeDL(direct_opts) as direct_ydl:
                         direct_ydl.download([video_url])
                     
-                    print(f" [+] Manual XHamster extraction successful!")
+                    _print(f" [+] Manual XHamster extraction successful!")
                     return True
                 else:
-                    print(f" [!] Could not find M3U8 URL in page content")
+                    _print(f" [!] Could not find M3U8 URL in page content")
                     
             except Exception as manual_e:
-                print(f" [!] Manual XHamster extraction failed: {manual_e}")
+                _print(f" [!] Manual XHamster extraction failed: {manual_e}")
         
         # Try manual extraction for Eporner if the built-in extractor fails
-        elif 'eporner.com' in url and ('Unable to extract hash' in str(e) or isinstance(e, AttributeError)):
-            print(f" [+] Attempting manual Eporner extraction...")
+        elif site_domain == 'eporner.com' and ('Unable to extract hash' in str(e) or isinstance(e, AttributeError)):
+            _print(f" [+] Attempting manual Eporner extraction...")
             try:
-                import requests
-                import re
-                
-                # Get page content
-                response = requests.get(url, 
-                    headers={'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'},
-                    timeout=30)
-                
-                # Extract video URL patterns
-                video_patterns = [
-                    r'src[\s]*=[\s]*["\']([^"\']*\.mp4[^"\']*)["\']',
-                    r'video_url[\s]*=[\s]*["\']([^"\']*\.mp4[^"\']*)["\']',
-                    r'"file"\s*:\s*"([^"]+\.mp4[^"]*)"',
-                    r'source\s+src=["\']([^"\']*\.mp4[^"\']*)["\']',
-                ]
-                
-                video_url = None
-                for pattern in video_patterns:
-                    matches = re.findall(pattern, response.text, re.IGNORECASE)
-                    if matches:
-                        video_url = matches[0]
-                        break
+                # Stream the page and stop reading at the first direct video URL
+                match = _search_page(url,
+                    {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'},
+                    EPORNER_MP4_PATTERN)
+                video_url = match.group('url') if match else None
                 
                 if video_url:
-                    print(f" [+] Found direct video URL, downloading...")
+                    _print(f" [+] Found direct video URL, downloading...")
                     
                     # Create simple options for direct download
                     direct_opts = {
@@ -193,37 +336,45 @@ def download_video(url, download_path):
                     with yt_dlp.YoutubeDL(direct_opts) as direct_ydl:
                         direct_ydl.download([video_url])
                     
-                    print(f" [+] Manual Eporner extraction successful!")
+                    _print(f" [+] Manual Eporner extraction successful!")
                     return True
                 else:
-                    print(f" [!] Could not find video URL in page content")
+                    _print(f" [!] Could not find video URL in page content")
                     
             except Exception as manual_e:
-                print(f" [!] Manual extraction failed: {manual_e}")
+                _print(f" [!] Manual extraction failed: {manual_e}")
         
         # Handle DownloadError specifically
         if isinstance(e, yt_dlp.DownloadError):
             handle_download_error(e)
         else:
-            print(f" [!] Error: Extraction failed - {type(e).__name__}: {e}")
+            _print(f" [!] Error: Extraction failed - {type(e).__name__}: {e}")
         return False
     except Exception as e:
-        print(f" [!] Error: An unexpected error occurred - {type(e).__name__}")
+        _print(f" [!] Error: An unexpected error occurred - {type(e).__name__}")
         return False
 
+def download_many(urls, download_path, workers=4):
+    """Download several URLs in parallel and return a {url: success} mapping.
+
+    Used by the CLI for multi-URL input. The web server does not need it:
+    it already runs each download request on its own thread.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(download_video, url, download_path): url for url in urls}
+        return {futures[future]: future.result() for future in as_completed(futures)}
+
 def handle_download_error(error):
     """Handle download errors with specific messages."""
-    error_msg = str(error).lower()
+    error_text = str(error)
+    found = {match.lastgroup for match in DOWNLOAD_ERROR_PATTERN.finditer(error_text)}
+    for kind, message in DOWNLOAD_ERROR_MESSAGES.items():
+        if kind in found:
+            _print(message)
+            return
     
-    if "unsupported url" in error_msg or "no video formats found" in error_msg:
-        print(" [!] Error: This URL is not supported or no video was found at this link")
-    elif "video unavailable" in error_msg or "private video" in error_msg:
-        print(" [!] Error: This video is unavailable, private, or has been removed")
-    elif "age" in error_msg and "restricted" in error_msg:
-        print(" [!] Error: This video is age-restricted and cannot be downloaded")
-    else:
-        error_summary = str(error).split(':')[0] if ':' in str(error) else str(error)
-        print(f" [!] Error: Unable to download video - {error_summary}")
+    error_summary = error_text.split(':')[0]
+    _print(f" [!] Error: Unable to download video - {error_summary}")
 
 def open_finder(path):
     """Open Finder window to the specified directory (macOS only)."""
@@ -267,17 +418,18 @@ def main():
     download_path = config.get_video_download_path()
     
     while True:
-        url = input(" [?] Video URL from supported sites (or 'help'/'folder'/'exit'): ")
+        url = input(" [?] Video URL from supported sites (or 'help'/'folder'/'exit'): ").strip()
+        command = url.lower()
         
-        if url.lower() == "exit":
+        if command == "exit":
             sys.exit(0)
         
-        if url.lower() == "help":
+        if command == "help":
             show_help()
             utilities.clear()
             continue
         
-        if url.lower() == "folder":
+        if command == "folder":
             print(" [?] Changing download folder...")
             new_folder = folderSelector.select_download_folder()
             if new_folder:
@@ -290,15 +442,32 @@ def main():
             utilities.clear()
             continue
         
-        if not url.strip():
+        if not url:
             print(" [!] Please enter a valid URL, 'help', 'folder', or 'exit' to quit\n")
             continue
 
         print(" [+] Downloading, please stand by...\n")
         
-        if download_video(url, download_path):
+        # Several whitespace-separated URLs are downloaded in parallel
+        urls = url.split()
+        if len(urls) > 1:
+            results = download_many(urls, download_path)
+            sys.stdout.flush()
+            failed = [u for u in urls if not results[u]]
+            if not failed:
+                print(" [+] All downloads completed successfully!")
+                open_finder(download_path)
+                break
+            for failed_url in failed:
+                print(f" [!] Failed: {failed_url}")
+            print(" [!] Please try a different URL, 'help', 'folder', or 'exit' to quit\n")
+            continue
+        
+        succeeded = download_video(url, download_path)
+        sys.stdout.flush()
+        if succeeded:
             print(" [+] Download completed successfully!")
             open_finder(download_path)
             break
         else:
-            print(" [!] Please try a different URL, 'help', 'folder', or 'exit' to quit\n")
\ No newline at end of file
+            print(" [!] Please try a different URL, 'help', 'folder', or 'exit' to quit\n")
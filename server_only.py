@@ -1,5 +1,6 @@
 """Standalone web server for Chrome extension integration."""
 
+import importlib.util
 import sys
 import signal
 import modules.utilities as utilities
@@ -28,18 +29,20 @@ if not os.path.exists(video_downloads_path):
 
 print(" [+] Checking required packages")
 
-# Check for yt-dlp dependency
+# Check for yt-dlp dependency without importing it; the server imports it on
+# the first download
 while True:
-    try:
-        import yt_dlp  # noqa: F401
+    missing = [name for name in config.REQUIRED_PACKAGES if importlib.util.find_spec(name) is None]
+    if not missing:
         print(" [+] All required packages are installed")
         break
-    except ImportError as e:
-        package_name = str(e).split("'")[1] if "'" in str(e) else str(e)[17:-1]
-        print(f" [!] Missing '{package_name}', installing...")
-        
-        pip_package = config.REQUIRED_PACKAGES.get(package_name, package_name)
-        utilities.install(pip_package)
+    
+    package_name = missing[0]
+    print(f" [!] Missing '{package_name}', installing...")
+    
+    pip_package = config.REQUIRED_PACKAGES[package_name]
+    utilities.install(pip_package)
+    importlib.invalidate_caches()
 
 print(" [+] Loading Modules")
 try:
@@ -2,9 +2,8 @@
 
 import sys
 import threading
-import time
 import signal
-from web_server import start_server
+from web_server import handle_sigterm, start_server
 
 def signal_handler(signum, frame):
     """Handle Ctrl+C gracefully."""
@@ -27,17 +26,22 @@ def main():
     
     # Register signal handler for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler)
+    # The server runs on a worker thread, where start_server can't install its
+    # SIGTERM handler; without it a stop would skip the final atexit saves
+    signal.signal(signal.SIGTERM, handle_sigterm)
     
     try:
         # Start web server in background thread
-        server_thread = threading.Thread(target=start_server, args=(8080,))
+        ready = threading.Event()
+        server_thread = threading.Thread(target=start_server, args=(8080, ready))
         server_thread.daemon = True
         server_thread.start()
         
-        # Give server time to start
-        time.sleep(2)
-        
-        print(" [+] Web server started - Chrome extension can now connect")
+        # Wait until the server is listening rather than for a fixed delay
+        if ready.wait(timeout=10):
+            print(" [+] Web server started - Chrome extension can now connect")
+        else:
+            print(" [!] Web server did not start within 10 seconds")
         print(" [+] You can also use the CLI interface below")
         print(" [+] " + "=" * 50)
         
@@ -0,0 +1,54 @@
+"""Tests for failed download logging in web_server."""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class AddFailedDownloadTest(unittest.TestCase):
+    def setUp(self):
+        # web_server writes its logs relative to the working directory
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        import web_server
+        self.ws = web_server
+        self.ws.failed_downloads = {}
+        self.ws.failed_url_index = {}
+        self.ws.SYSTEM_INFO["yt_dlp_version"] = "unknown"
+        self.ws.system_info_written = None
+
+    def tearDown(self):
+        self.ws.__dict__.pop("yt_dlp", None)
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_logs_failure_once_yt_dlp_is_loaded(self):
+        # Stand-in for the lazily imported package: yt_dlp.version is a module
+        yt_dlp = types.ModuleType("yt_dlp")
+        yt_dlp.version = types.ModuleType("yt_dlp.version")
+        yt_dlp.version.__version__ = "2025.01.01"
+        self.ws.yt_dlp = yt_dlp
+
+        self.ws.add_failed_download("abc", {
+            "url": "https://example.com/watch?v=1",
+            "title": "Example",
+            "error": "boom",
+        })
+
+        with open(self.ws.system_info_file, "rb") as f:
+            system_info = self.ws.utilities.json_loads(f.read())
+        self.assertEqual(system_info["yt_dlp_version"], "2025.01.01")
+        with open(self.ws.failed_downloads_detailed_file, "rb") as f:
+            entry = self.ws.utilities.json_loads(f.readline())
+        self.assertEqual(entry["url"], "https://example.com/watch?v=1")
+        self.assertIn("abc", self.ws.failed_downloads)
+
+
+if __name__ == "__main__":
+    unittest.main()
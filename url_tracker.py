@@ -4,57 +4,228 @@ Simple URL tracking system for VidSnatch.
 Tracks all download URLs and their completion status.
 """
 
-import json
+import atexit
 import os
+import queue
+import secrets
 import time
 from datetime import datetime
 import threading
 from modules.config import URL_TRACKER_FILE
+import modules.utilities as utilities
+
+# Changes are coalesced and written at most once per interval (seconds)
+FLUSH_INTERVAL = 0.5
+
+# Entry fields holding epoch seconds (older versions stored ISO strings)
+TIMESTAMP_FIELDS = ('added', 'completed', 'last_attempt')
+
+class _CleanTable(dict):
+    """str.translate table that drops everything but letters, digits and whitespace.
+
+    Entries are filled in on first sight of each code point, so the table
+    only ever holds characters that have actually appeared.
+    """
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        value = char if char.isalnum() or char.isspace() else None
+        self[codepoint] = value
+        return value
+
+_CLEAN_TABLE = _CleanTable()
+
+def _clean_text(text):
+    """Lowercase text and keep only letters, digits and whitespace."""
+    return text.lower().translate(_CLEAN_TABLE)
 
 class URLTracker:
     def __init__(self, storage_file=URL_TRACKER_FILE):
         self.storage_file = storage_file
+        # Created once here rather than on every save
+        os.makedirs(os.path.dirname(storage_file), exist_ok=True)
         self.urls = {}
         self.lock = threading.Lock()
+        self._io_lock = threading.Lock()  # Serialises writes to the snapshot and log files
+        self.log_file = storage_file + '.log'
+        self._pending = set()  # IDs changed since the last flush
+        self._log_size = 0
+        self._snapshot_size = 0
+        self._log_generation = None  # Generation of the snapshot on disk; None before the first
+        self._flush_queue = queue.Queue(maxsize=1)  # Holds at most one wake-up token
+        # (url_id -> cleaned title, word -> frozenset of url_ids), replaced as a unit
+        self._title_index = ({}, {})
+        self._by_url = {}  # url -> ID of its first tracked entry, replaced as a unit
         self.load()
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.flush)
     
     def load(self):
-        """Load URLs from persistent storage."""
+        """Load URLs from the snapshot and replay the change log on top."""
         try:
             if os.path.exists(self.storage_file):
-                with open(self.storage_file, 'r') as f:
-                    self.urls = json.load(f)
+                with open(self.storage_file, 'rb') as f:
+                    snapshot = utilities.json_loads(f.read())
+                if utilities.LOG_GENERATION_KEY in snapshot:
+                    self._log_generation = snapshot[utilities.LOG_GENERATION_KEY]
+                    self.urls = snapshot['urls']
+                else:
+                    self.urls = snapshot  # Older versions saved the bare URL map
+            replayed = self._replay_log()
+            if os.path.exists(self.storage_file) or replayed:
                 print(f" [+] Loaded {len(self.urls)} tracked URLs")
+            if self._upgrade_timestamps() or replayed:
+                # Fold the log and any upgraded entries into a fresh snapshot on startup
+                self.save()
         except Exception as e:
             print(f" [!] Error loading URL tracker: {e}")
             self.urls = {}
+        self._rebuild_title_index()
+        self._rebuild_url_index()
+    
+    def _replay_log(self):
+        """Apply change-log records to the loaded URLs.
+
+        Returns whether the log needs folding into a fresh snapshot, which
+        includes a stale log that was skipped.
+        """
+        records = utilities.read_change_log(self.log_file, self._log_generation)
+        if records is None:
+            return True
+        for record in records:
+            if record['entry'] is None:
+                self.urls.pop(record['id'], None)
+            else:
+                self.urls[record['id']] = record['entry']
+        return bool(records)
+    
+    def _upgrade_timestamps(self):
+        """Convert ISO timestamps from older versions to epoch seconds; returns True if any changed."""
+        upgraded = False
+        for data in self.urls.values():
+            for field in TIMESTAMP_FIELDS:
+                value = data.get(field)
+                if isinstance(value, str):
+                    data[field] = datetime.fromisoformat(value).timestamp()
+                    upgraded = True
+        return upgraded
     
     def save(self):
-        """Save URLs to persistent storage."""
+        """Write a full snapshot of the URLs and truncate the change log."""
+        try:
+            with self._io_lock:
+                self._write_snapshot()
+        except Exception as e:
+            print(f" [!] Error saving URL tracker: {e}")
+    
+    def _write_snapshot(self):
+        """Write the snapshot and empty the log; the caller holds the I/O lock."""
+        with self.lock:
+            # The URL map is never mutated in place, so it can be encoded unlocked
+            urls = self.urls
+            self._pending.clear()
+        # The new generation marks every record in the current log as covered,
+        # so a crash before the log is reset can't replay them over the snapshot
+        generation = (self._log_generation or 0) + 1
+        data = utilities.json_dumps({utilities.LOG_GENERATION_KEY: generation, 'urls': urls})
+        utilities.atomic_write(self.storage_file, data)
+        utilities.reset_change_log(self.log_file, generation)
+        self._log_generation = generation
+        self._snapshot_size = len(data)
+        self._log_size = 0
+    
+    def flush(self):
+        """Append changes made since the last flush to the change log."""
         try:
-            os.makedirs(os.path.dirname(self.storage_file), exist_ok=True)
-            with self.lock:
-                with open(self.storage_file, 'w') as f:
-                    json.dump(self.urls, f, indent=2)
+            with self._io_lock:
+                # Only take the changed IDs under the lock; mutators are not
+                # held up while records are encoded and written
+                with self.lock:
+                    if not self._pending:
+                        return
+                    pending = self._pending
+                    self._pending = set()
+                    urls = self.urls
+                records = b''.join(
+                    utilities.json_dumps({'id': url_id, 'entry': urls.get(url_id)}, indent=False) + b'\n'
+                    for url_id in pending
+                )
+                if not os.path.exists(self.log_file) or not os.path.getsize(self.log_file):
+                    records = utilities.change_log_header(self._log_generation) + records
+                with open(self.log_file, 'ab') as f:
+                    f.write(records)
+                self._log_size += len(records)
+                # Compact once the log outgrows the snapshot it patches
+                if self._log_size > 2 * max(self._snapshot_size, 4096):
+                    self._write_snapshot()
         except Exception as e:
             print(f" [!] Error saving URL tracker: {e}")
     
+    def _publish(self, url_id, entry):
+        """Swap in a copy of the URL map with one entry replaced; the caller holds the lock."""
+        clean_titles, word_index = self._title_index
+        if url_id not in clean_titles:
+            # Titles never change, so only new entries need indexing; the
+            # index is published before the URL so readers always find it
+            clean_title = _clean_text(entry['title'])
+            clean_titles = {**clean_titles, url_id: clean_title}
+            word_index = dict(word_index)
+            for word in set(clean_title.split()):
+                word_index[word] = word_index.get(word, frozenset()) | {url_id}
+            self._title_index = (clean_titles, word_index)
+            if entry['url'] not in self._by_url:
+                self._by_url = {**self._by_url, entry['url']: url_id}
+        
+        urls = dict(self.urls)
+        urls[url_id] = entry
+        self.urls = urls
+        self._mark_dirty(url_id)
+    
+    def _rebuild_title_index(self):
+        """Recompute the cleaned-title and word index for every tracked URL."""
+        clean_titles = {url_id: _clean_text(data['title']) for url_id, data in self.urls.items()}
+        word_index = {}
+        for url_id, clean_title in clean_titles.items():
+            for word in set(clean_title.split()):
+                word_index.setdefault(word, set()).add(url_id)
+        self._title_index = (clean_titles, {word: frozenset(ids) for word, ids in word_index.items()})
+    
+    def _rebuild_url_index(self):
+        """Recompute the URL lookup, keeping the earliest entry for each URL."""
+        by_url = {}
+        for url_id, data in self.urls.items():
+            by_url.setdefault(data['url'], url_id)
+        self._by_url = by_url
+    
+    def _mark_dirty(self, url_id):
+        """Record a changed ID for the background flusher; the caller holds the lock."""
+        self._pending.add(url_id)
+        try:
+            self._flush_queue.put_nowait(None)
+        except queue.Full:
+            pass  # A flush is already queued and will pick this change up
+    
+    def _flush_loop(self):
+        """Write pending changes, coalescing bursts of updates into one append."""
+        while True:
+            self._flush_queue.get()
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+    
     def add_url(self, url, title=None):
         """Add a URL to track. Returns the tracking ID."""
-        # Use URL as the key for simplicity
-        url_id = str(hash(url + str(time.time())))
+        # Random IDs stay unique across restarts without hashing the URL
+        url_id = secrets.token_hex(8)
         
         with self.lock:
-            self.urls[url_id] = {
+            self._publish(url_id, {
                 'url': url,
                 'title': title or 'Unknown',
                 'status': 'pending',
-                'added': datetime.now().isoformat(),
+                'added': time.time(),
                 'completed': None,
                 'attempts': 0
-            }
+            })
         
-        self.save()
         print(f" [+] Tracking URL: {url[:50]}...")
         return url_id
     
@@ -62,97 +233,105 @@ class URLTracker:
         """Mark a URL as being attempted."""
         with self.lock:
             if url_id in self.urls:
-                self.urls[url_id]['status'] = 'downloading'
-                self.urls[url_id]['attempts'] += 1
-                self.urls[url_id]['last_attempt'] = datetime.now().isoformat()
-        self.save()
+                entry = dict(self.urls[url_id])
+                entry['status'] = 'downloading'
+                entry['attempts'] += 1
+                entry['last_attempt'] = time.time()
+                self._publish(url_id, entry)
     
     def mark_completed(self, url_id):
         """Mark a URL as successfully downloaded."""
         with self.lock:
             if url_id in self.urls:
-                self.urls[url_id]['status'] = 'completed'
-                self.urls[url_id]['completed'] = datetime.now().isoformat()
-                print(f" [+] Marked as completed: {self.urls[url_id]['title']}")
-        self.save()
+                entry = dict(self.urls[url_id])
+                entry['status'] = 'completed'
+                entry['completed'] = time.time()
+                self._publish(url_id, entry)
+                print(f" [+] Marked as completed: {entry['title']}")
     
     def mark_failed(self, url_id, error=None):
         """Mark a URL as failed (but will retry on restart)."""
         with self.lock:
             if url_id in self.urls:
-                self.urls[url_id]['status'] = 'failed'
-                self.urls[url_id]['last_error'] = error or 'Unknown error'
-                print(f" [!] Marked as failed: {self.urls[url_id]['title']}")
-        self.save()
+                entry = dict(self.urls[url_id])
+                entry['status'] = 'failed'
+                entry['last_error'] = error or 'Unknown error'
+                self._publish(url_id, entry)
+                print(f" [!] Marked as failed: {entry['title']}")
     
     def get_incomplete_urls(self):
         """Get all URLs that haven't been successfully downloaded."""
-        incomplete = []
-        with self.lock:
-            for url_id, data in self.urls.items():
-                if data['status'] != 'completed':
-                    incomplete.append((url_id, data))
-        return incomplete
+        # Filter one published snapshot; later updates replace self.urls, so
+        # callers may mark entries while walking the result
+        urls = self.urls
+        return [(url_id, data) for url_id, data in urls.items() if data['status'] != 'completed']
     
     def find_by_url(self, url):
         """Find a tracking entry by URL."""
-        with self.lock:
-            for url_id, data in self.urls.items():
-                if data['url'] == url:
-                    return url_id, data
-        return None, None
+        url_id = self._by_url.get(url)
+        # The entry may have just been cleaned up, so check it is still tracked
+        data = self.urls.get(url_id) if url_id is not None else None
+        if data is None:
+            return None, None
+        return url_id, data
     
     def find_by_partial_filename(self, filename):
         """Find a URL that might match a partial filename."""
         # Clean filename for comparison
-        clean_filename = filename.replace('.part', '').replace('.ytdl', '').replace('.temp', '').lower()
-        clean_filename = ''.join(c for c in clean_filename if c.isalnum() or c.isspace())
+        clean_filename = _clean_text(filename.replace('.part', '').replace('.ytdl', '').replace('.temp', ''))
+        filename_words = set(clean_filename.split())
         
-        best_match = None
-        with self.lock:
-            for url_id, data in self.urls.items():
-                if data['status'] == 'completed':
-                    continue
-                    
-                # Clean title for comparison
-                clean_title = data['title'].lower()
-                clean_title = ''.join(c for c in clean_title if c.isalnum() or c.isspace())
-                
-                # Simple substring match
-                if clean_title in clean_filename or clean_filename in clean_title:
-                    best_match = (url_id, data)
-                    break
-                
-                # Word overlap check
-                filename_words = set(clean_filename.split())
-                title_words = set(clean_title.split())
-                if filename_words and title_words:
-                    overlap = len(filename_words.intersection(title_words))
-                    if overlap >= min(3, len(filename_words) * 0.5):
-                        best_match = (url_id, data)
-                        break
+        # Read the URLs before the index; entries are indexed before they are published
+        urls = self.urls
+        clean_titles, word_index = self._title_index
         
-        return best_match
+        # Count shared words per entry from the index instead of re-splitting every title
+        word_matches = set()
+        if filename_words:
+            overlaps = {}
+            for word in filename_words:
+                for url_id in word_index.get(word, ()):
+                    overlaps[url_id] = overlaps.get(url_id, 0) + 1
+            threshold = min(3, len(filename_words) * 0.5)
+            word_matches = {url_id for url_id, overlap in overlaps.items() if overlap >= threshold}
+        
+        # Keep tracker order so the first matching entry still wins
+        for url_id, data in urls.items():
+            if data['status'] == 'completed':
+                continue
+            
+            clean_title = clean_titles.get(url_id)
+            if clean_title is None:
+                clean_title = _clean_text(data['title'])
+            
+            # Simple substring match, then word overlap
+            if (clean_title in clean_filename or clean_filename in clean_title
+                    or url_id in word_matches):
+                return url_id, data
+        
+        return None
     
     def cleanup_old_completed(self, days=7):
         """Remove completed URLs older than specified days."""
-        cutoff = datetime.now().timestamp() - (days * 86400)
-        removed = 0
+        cutoff = time.time() - (days * 86400)
         
         with self.lock:
-            to_remove = []
-            for url_id, data in self.urls.items():
-                if data['status'] == 'completed' and data.get('completed'):
-                    completed_time = datetime.fromisoformat(data['completed']).timestamp()
-                    if completed_time < cutoff:
-                        to_remove.append(url_id)
+            # Build the surviving map in one pass and publish it as a whole
+            urls = {
+                url_id: data for url_id, data in self.urls.items()
+                if not (data['status'] == 'completed' and data.get('completed')
+                        and data['completed'] < cutoff)
+            }
+            removed = len(self.urls) - len(urls)
             
-            for url_id in to_remove:
-                del self.urls[url_id]
-                removed += 1
+            if removed:
+                for url_id in self.urls.keys() - urls.keys():
+                    self._mark_dirty(url_id)
+                self.urls = urls
+                self._rebuild_title_index()
+                self._rebuild_url_index()
         
         if removed > 0:
-            self.save()
             print(f" [+] Cleaned up {removed} old completed URLs")
         
         return removed
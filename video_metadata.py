@@ -4,118 +4,300 @@ Video metadata storage for names and tags.
 Stores person names and tags for video files.
 """
 
-import json
+import atexit
 import os
+import queue
 import threading
+import time
+
+import modules.utilities as utilities
+
+# Changes are coalesced and written at most once per interval (seconds)
+FLUSH_INTERVAL = 0.5
+
+# Files are spread over this many independently locked shards (power of two)
+SHARD_COUNT = 16
+
+SECTIONS = (
+    'person_names',  # filename -> person name
+    'file_tags',     # filename -> tags, kept in memory as an ordered dict for O(1) lookups
+    'ratings',       # filename -> rating (1-5)
+)
+
+def _empty_sections():
+    """Return a fresh mapping of every section to an empty dict."""
+    return {section: {} for section in SECTIONS}
+
+def _merge_shards(shards):
+    """Combine per-shard sections into one mapping of every section."""
+    data = _empty_sections()
+    for shard in shards:
+        for section in SECTIONS:
+            data[section].update(shard[section])
+    data['file_tags'] = {filename: list(tags) for filename, tags in data['file_tags'].items()}
+    return data
 
 class VideoMetadata:
     def __init__(self, storage_file):
         self.storage_file = storage_file
-        self.data = {
-            'person_names': {},  # filename -> person name
-            'file_tags': {},     # filename -> list of tags
-            'ratings': {}        # filename -> rating (1-5)
-        }
-        self.lock = threading.Lock()
+        # Created once here rather than on every save
+        os.makedirs(os.path.dirname(storage_file), exist_ok=True)
+        # Each shard maps section -> {filename: value} and is replaced, never
+        # mutated, so readers can use it without taking its lock
+        self._shards = [_empty_sections() for _ in range(SHARD_COUNT)]
+        self._merged = ((), None)  # (shards it was built from, merged data)
+        self._shard_locks = [threading.Lock() for _ in range(SHARD_COUNT)]
+        self._pending = [set() for _ in range(SHARD_COUNT)]  # (section, filename) pairs changed since the last flush
+        self.lock = threading.Lock()  # Serialises writes to the snapshot and log files
+        self.log_file = storage_file + '.log'
+        self._log_size = 0
+        self._snapshot_size = 0
+        self._log_generation = None  # Generation of the snapshot on disk; None before the first
+        self._flush_queue = queue.Queue(maxsize=1)  # Holds at most one wake-up token
         self.load()
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.flush)
+
+    @property
+    def data(self):
+        """All metadata merged across shards.
+
+        The merge is cached until a shard is next replaced and is shared
+        between callers, so it must be treated as read-only.
+        """
+        shards = tuple(self._shards)
+        built_from, merged = self._merged
+        if len(built_from) != len(shards) or any(a is not b for a, b in zip(built_from, shards)):
+            merged = _merge_shards(shards)
+            self._merged = (shards, merged)
+        return merged
+
+    def _shard_index(self, filename):
+        """Return the index of the shard that owns a filename."""
+        return hash(filename) & (SHARD_COUNT - 1)
 
     def load(self):
-        """Load metadata from persistent storage."""
+        """Load metadata from the snapshot and replay the change log on top."""
+        data = _empty_sections()
         try:
             if os.path.exists(self.storage_file):
-                with open(self.storage_file, 'r') as f:
-                    self.data = json.load(f)
-                # Ensure all keys exist for backwards compatibility
-                if 'ratings' not in self.data:
-                    self.data['ratings'] = {}
-                print(f" [+] Loaded video metadata for {len(self.data.get('person_names', {}))} files")
+                with open(self.storage_file, 'rb') as f:
+                    snapshot = utilities.json_loads(f.read())
+                self._log_generation = snapshot.pop(utilities.LOG_GENERATION_KEY, None)
+                # Missing sections keep their empty defaults for backwards compatibility
+                data.update(snapshot)
+            replayed = self._replay_log(data)
+            if os.path.exists(self.storage_file) or replayed:
+                print(f" [+] Loaded video metadata for {len(data.get('person_names', {}))} files")
         except Exception as e:
             print(f" [!] Error loading video metadata: {e}")
-            self.data = {'person_names': {}, 'file_tags': {}, 'ratings': {}}
+            data = _empty_sections()
+            replayed = 0
+
+        shards = [_empty_sections() for _ in range(SHARD_COUNT)]
+        for section in SECTIONS:
+            for filename, value in data[section].items():
+                if section == 'file_tags':
+                    value = dict.fromkeys(value)
+                shards[self._shard_index(filename)][section][filename] = value
+        self._shards = shards
+
+        if replayed:
+            # Fold the log into a fresh snapshot on startup
+            self.save()
+
+    def _replay_log(self, data):
+        """Apply change-log records to loaded metadata.
+
+        Returns whether the log needs folding into a fresh snapshot, which
+        includes a stale log that was skipped.
+        """
+        records = utilities.read_change_log(self.log_file, self._log_generation)
+        if records is None:
+            return True
+        for record in records:
+            section = data[record['section']]
+            if record['value'] is None:
+                section.pop(record['key'], None)
+            else:
+                section[record['key']] = record['value']
+        return bool(records)
 
     def save(self):
-        """Save metadata to persistent storage."""
+        """Write a full snapshot of the metadata and truncate the change log."""
+        try:
+            with self.lock:
+                self._write_snapshot()
+        except Exception as e:
+            print(f" [!] Error saving video metadata: {e}")
+
+    def _write_snapshot(self):
+        """Write the snapshot and empty the log; the caller holds self.lock."""
+        # Everything pending is covered by the snapshot taken alongside it
+        shards = []
+        for index, shard_lock in enumerate(self._shard_locks):
+            with shard_lock:
+                shards.append(self._shards[index])
+                self._pending[index].clear()
+        # The new generation marks every record in the current log as covered,
+        # so a crash before the log is reset can't replay them over the snapshot
+        generation = (self._log_generation or 0) + 1
+        payload = utilities.json_dumps({
+            utilities.LOG_GENERATION_KEY: generation,
+            **_merge_shards(shards),
+        })
+        utilities.atomic_write(self.storage_file, payload)
+        utilities.reset_change_log(self.log_file, generation)
+        self._log_generation = generation
+        self._snapshot_size = len(payload)
+        self._log_size = 0
+
+    def flush(self):
+        """Append changes made since the last flush to the change log."""
         try:
-            os.makedirs(os.path.dirname(self.storage_file), exist_ok=True)
             with self.lock:
-                with open(self.storage_file, 'w') as f:
-                    json.dump(self.data, f, indent=2)
+                changes = []
+                for index, shard_lock in enumerate(self._shard_locks):
+                    with shard_lock:
+                        shard = self._shards[index]
+                        for section, filename in self._pending[index]:
+                            value = shard[section].get(filename)
+                            if section == 'file_tags' and value is not None:
+                                value = list(value)
+                            changes.append((section, filename, value))
+                        self._pending[index].clear()
+                if not changes:
+                    return
+                records = b''.join(
+                    utilities.json_dumps({
+                        'section': section,
+                        'key': filename,
+                        'value': value,
+                    }, indent=False) + b'\n'
+                    for section, filename, value in changes
+                )
+                if not os.path.exists(self.log_file) or not os.path.getsize(self.log_file):
+                    records = utilities.change_log_header(self._log_generation) + records
+                with open(self.log_file, 'ab') as f:
+                    f.write(records)
+                self._log_size += len(records)
+                # Compact once the log outgrows the snapshot it patches
+                if self._log_size > 2 * max(self._snapshot_size, 4096):
+                    self._write_snapshot()
         except Exception as e:
             print(f" [!] Error saving video metadata: {e}")
 
+    def _publish(self, index, section, values, *filenames):
+        """Swap in a new copy of one shard section; the caller holds that shard's lock.
+
+        Readers never take the lock: they see either the old or the new
+        section, never one that is being modified.
+        """
+        self._shards[index] = {**self._shards[index], section: values}
+        self._pending[index].update((section, filename) for filename in filenames)
+        try:
+            self._flush_queue.put_nowait(None)
+        except queue.Full:
+            pass  # A flush is already queued and will pick this change up
+
+    def _flush_loop(self):
+        """Write pending changes, coalescing bursts of updates into one append."""
+        while True:
+            self._flush_queue.get()
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+
     def set_person_name(self, filename, name):
         """Set person name for a file."""
-        with self.lock:
+        index = self._shard_index(filename)
+        with self._shard_locks[index]:
+            names = dict(self._shards[index]['person_names'])
             if name and name.strip():
-                self.data['person_names'][filename] = name.strip()
+                names[filename] = name.strip()
             else:
                 # Remove if empty
-                self.data['person_names'].pop(filename, None)
-        self.save()
+                names.pop(filename, None)
+            self._publish(index, 'person_names', names, filename)
 
     def get_person_name(self, filename):
         """Get person name for a file."""
-        return self.data['person_names'].get(filename, '')
+        return self._shards[self._shard_index(filename)]['person_names'].get(filename, '')
 
     def set_tags(self, filename, tags):
         """Set tags for a file."""
-        with self.lock:
+        index = self._shard_index(filename)
+        with self._shard_locks[index]:
+            file_tags = dict(self._shards[index]['file_tags'])
             if tags:
-                self.data['file_tags'][filename] = tags
+                file_tags[filename] = dict.fromkeys(tags)
             else:
                 # Remove if empty
-                self.data['file_tags'].pop(filename, None)
-        self.save()
+                file_tags.pop(filename, None)
+            self._publish(index, 'file_tags', file_tags, filename)
 
     def get_tags(self, filename):
         """Get tags for a file."""
-        return self.data['file_tags'].get(filename, [])
+        return list(self._shards[self._shard_index(filename)]['file_tags'].get(filename, ()))
 
     def set_rating(self, filename, rating):
         """Set rating for a file (1-5 stars)."""
-        with self.lock:
+        index = self._shard_index(filename)
+        with self._shard_locks[index]:
+            ratings = dict(self._shards[index]['ratings'])
             if rating is not None and 1 <= rating <= 5:
-                self.data['ratings'][filename] = rating
+                ratings[filename] = rating
             else:
                 # Remove if invalid or None
-                self.data['ratings'].pop(filename, None)
-        self.save()
+                ratings.pop(filename, None)
+            self._publish(index, 'ratings', ratings, filename)
 
     def get_rating(self, filename):
         """Get rating for a file."""
-        return self.data['ratings'].get(filename, 0)
+        return self._shards[self._shard_index(filename)]['ratings'].get(filename, 0)
 
     def add_tag(self, filename, tag):
         """Add a single tag to a file."""
-        with self.lock:
-            if filename not in self.data['file_tags']:
-                self.data['file_tags'][filename] = []
-            if tag not in self.data['file_tags'][filename]:
-                self.data['file_tags'][filename].append(tag)
-        self.save()
+        index = self._shard_index(filename)
+        with self._shard_locks[index]:
+            tags = self._shards[index]['file_tags'].get(filename, {})
+            if tag not in tags:
+                file_tags = dict(self._shards[index]['file_tags'])
+                file_tags[filename] = {**tags, tag: None}
+                self._publish(index, 'file_tags', file_tags, filename)
 
     def remove_tag(self, filename, tag):
         """Remove a single tag from a file."""
-        with self.lock:
-            if filename in self.data['file_tags']:
-                if tag in self.data['file_tags'][filename]:
-                    self.data['file_tags'][filename].remove(tag)
-                if not self.data['file_tags'][filename]:
-                    del self.data['file_tags'][filename]
-        self.save()
+        index = self._shard_index(filename)
+        with self._shard_locks[index]:
+            if filename in self._shards[index]['file_tags']:
+                file_tags = dict(self._shards[index]['file_tags'])
+                tags = dict(file_tags[filename])
+                tags.pop(tag, None)
+                if tags:
+                    file_tags[filename] = tags
+                else:
+                    del file_tags[filename]
+                self._publish(index, 'file_tags', file_tags, filename)
 
     def get_all_data(self):
         """Get all metadata."""
-        return dict(self.data)
+        return self.data
 
     def bulk_import(self, person_names_dict, file_tags_dict):
         """Bulk import data (for migration from localStorage)."""
-        with self.lock:
-            if person_names_dict:
-                self.data['person_names'].update(person_names_dict)
-            if file_tags_dict:
-                self.data['file_tags'].update(file_tags_dict)
-        self.save()
+        for section, values in (('person_names', person_names_dict), ('file_tags', file_tags_dict)):
+            if not values:
+                continue
+            # Group by shard so each shard is copied and locked once
+            by_shard = {}
+            for filename, value in values.items():
+                if section == 'file_tags':
+                    value = dict.fromkeys(value)
+                by_shard.setdefault(self._shard_index(filename), {})[filename] = value
+            for index, shard_values in by_shard.items():
+                with self._shard_locks[index]:
+                    self._publish(index, section, {**self._shards[index][section], **shard_values},
+                                  *shard_values)
         print(f" [+] Imported metadata for {len(person_names_dict)} names and {len(file_tags_dict)} tag sets")
 
 # Global instance
@@ -1,8 +1,13 @@
 """Enhanced web server for Chrome extension integration with Quikvid-DL."""
 
+import atexit
+import collections
+import functools
+import importlib.util
 import json
 import os
 import re
+import shutil
 import sys
 import threading
 import time
@@ -11,31 +16,18 @@ import signal
 import subprocess
 import logging
 import logging.handlers
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
-# Import with dependency check like main.py
 import modules.config as config
 import modules.utilities as utilities
+# videoDownloader only imports yt-dlp inside its download functions
+import modules.videoDownloader as videoDownloader
 from url_tracker import init_tracker, get_tracker
 from file_metadata import get_file_metadata
 from video_metadata import get_video_metadata
 
-# Check for yt-dlp dependency
-while True:
-    try:
-        import yt_dlp  # noqa: F401
-
-        break
-    except ImportError as e:
-        package_name = str(e).split("'")[1] if "'" in str(e) else str(e)[17:-1]
-        print(f" [!] Installing missing package: {package_name}")
-        pip_package = config.REQUIRED_PACKAGES.get(package_name, package_name)
-        utilities.install(pip_package)
-
-# Now safe to import videoDownloader
-import modules.videoDownloader as videoDownloader
-
 # Global dictionary to track downloads
 active_downloads = {}
 download_lock = threading.Lock()
@@ -43,56 +35,160 @@ download_lock = threading.Lock()
 # Failed downloads persistence
 failed_downloads = {}
 failed_downloads_file = ".logs/failed_downloads.json"
+# Held by everything that changes failed_downloads or failed_url_index
+failed_downloads_lock = threading.Lock()
+failed_downloads_io_lock = threading.Lock()  # Serialises writes to failed_downloads_file
+failed_url_index = {}  # url -> ID of its earliest failed download
+
+# Failure bursts (e.g. a playlist) are coalesced into one write per interval (seconds)
+FAILED_DOWNLOADS_SAVE_INTERVAL = 0.5
+failed_downloads_dirty = threading.Event()
 
 # Active downloads persistence
 active_downloads_file = ".logs/active_downloads.json"
 
+# Progress updates are coalesced into at most one write per interval (seconds)
+ACTIVE_DOWNLOADS_SAVE_INTERVAL = 0.5
+active_downloads_dirty = threading.Event()
+
+# Characters dropped from titles and filenames before fuzzy matching
+MATCH_STRIP_PATTERN = re.compile(r"[^\w\s-]")
+# The same set restricted to ASCII, for str.translate on ASCII-only text
+MATCH_STRIP_TABLE = dict.fromkeys(
+    i for i in range(128) if MATCH_STRIP_PATTERN.match(chr(i))
+)
+
+# Responses that never change, encoded once
+STATUS_RESPONSE_BODY = json.dumps(
+    {"status": "running", "message": "Quikvid-DL server is active"}, indent=2
+).encode("utf-8")
+web_interface_pages = {}  # active download count -> rendered homepage bytes
+
+# Media probing tools, looked up once; None when not installed
+FFPROBE_PATH = shutil.which("ffprobe")
+MEDIAINFO_PATH = shutil.which("mediainfo")
+
+# Suffixes yt-dlp uses for unfinished downloads
+PARTIAL_FILE_SUFFIXES = (".part", ".ytdl", ".temp")
+
+# Download folder listings are reused for this long (seconds)
+DIR_LISTING_TTL = 1.0
+dir_listings = {}  # folder path -> (monotonic time listed, file names)
+
+# Developer logs, written as JSON Lines so each event is a single append
+failed_downloads_detailed_file = ".logs/failed_downloads_detailed.jsonl"
+duplicate_attempts_file = ".logs/duplicate_attempts.jsonl"
+jsonl_line_counts = {}
+jsonl_lock = threading.Lock()
+
+# Realistic browser headers sent with every download; Referer is added per URL
+DOWNLOAD_HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Cache-Control": "max-age=0",
+}
+
+# Environment shared by every failure log entry, written once beside the logs
+SYSTEM_INFO = {
+    "python_version": sys.version,
+    "platform": sys.platform,
+    "yt_dlp_version": "unknown",
+    "user_agent": DOWNLOAD_HTTP_HEADERS["User-Agent"],
+}
+system_info_file = ".logs/system_info.json"
+system_info_written = None
+
+
+def install_missing_packages():
+    """Install required packages that are missing, like main.py does.
+
+    Only checks that yt-dlp can be found; the extractor registry is loaded
+    when the first download starts (see _ensure_ytdlp).
+    """
+    for package_name, pip_package in config.REQUIRED_PACKAGES.items():
+        if importlib.util.find_spec(package_name) is None:
+            print(f" [!] Installing missing package: {package_name}")
+            utilities.install(pip_package)
+            importlib.invalidate_caches()
+
+
+def _ensure_ytdlp():
+    """Import yt_dlp on first use and publish it as a module global."""
+    global yt_dlp
+    import yt_dlp
+
 
 def save_active_downloads():
+    """Schedule a save of the active downloads on the background writer thread."""
+    active_downloads_dirty.set()
+
+
+def write_active_downloads():
     """Save active downloads to persistent storage (only metadata, not the actual download state)."""
     try:
         os.makedirs(os.path.dirname(active_downloads_file), exist_ok=True)
-        # Only save basic info that can be used to detect orphaned downloads
-        active_data = {}
-        for download_id, progress in active_downloads.items():
-            # Only save downloads that are actually in progress
-            if progress.status in ["preparing", "downloading", "processing"]:
-                active_data[download_id] = {
-                    "title": progress.title,
-                    "url": progress.url,
-                    "status": progress.status,
-                    "percent": progress.percent,
-                    "start_time": progress.start_time,
-                }
-        with open(active_downloads_file, "w") as f:
-            json.dump(active_data, f, indent=2)
+        # Only save downloads that are actually in progress; the encoder
+        # reduces each one to the basic info used to detect orphaned downloads
+        with download_lock:
+            active_data = {
+                download_id: progress
+                for download_id, progress in active_downloads.items()
+                if progress.status in ["preparing", "downloading", "processing"]
+            }
+        utilities.atomic_write(
+            active_downloads_file,
+            utilities.json_dumps(active_data, default=encode_download_progress),
+        )
     except Exception as e:
         print(f" [!] Error saving active downloads: {e}")
 
 
+def active_downloads_writer():
+    """Background thread that writes active downloads, coalescing bursts of saves."""
+    while True:
+        active_downloads_dirty.wait()
+        time.sleep(ACTIVE_DOWNLOADS_SAVE_INTERVAL)
+        active_downloads_dirty.clear()
+        write_active_downloads()
+
+
 def load_active_downloads():
     """Load active downloads from persistent storage and mark as interrupted."""
     global active_downloads
     try:
         if os.path.exists(active_downloads_file):
-            with open(active_downloads_file, "r") as f:
-                saved_downloads = json.load(f)
+            with open(active_downloads_file, "rb") as f:
+                saved_downloads = utilities.json_loads(f.read())
 
                 if saved_downloads:
                     print(
                         f" [!] Found {len(saved_downloads)} interrupted downloads from previous session"
                     )
 
-                    # Convert saved downloads to failed downloads since they were interrupted
-                    for download_id, download_info in saved_downloads.items():
-                        # Add to failed downloads so they can be retried
-                        failed_downloads[download_id] = {
-                            "title": download_info["title"],
-                            "url": download_info["url"],
-                            "error": "Download interrupted by server restart",
-                            "retry_count": 0,
-                            "open_folder": True,
-                        }
+                    # Convert saved downloads to failed downloads since they were
+                    # interrupted, merging them in one update so they can be retried
+                    with failed_downloads_lock:
+                        failed_downloads.update(
+                            {
+                                download_id: {
+                                    "title": download_info["title"],
+                                    "url": download_info["url"],
+                                    "error": "Download interrupted by server restart",
+                                    "retry_count": 0,
+                                    "open_folder": True,
+                                }
+                                for download_id, download_info in saved_downloads.items()
+                            }
+                        )
+                        rebuild_failed_url_index()
 
                     # Save the failed downloads
                     save_failed_downloads()
@@ -101,8 +197,8 @@ def load_active_downloads():
                     )
 
                     # Clear the active downloads file
-                    with open(active_downloads_file, "w") as f:
-                        json.dump({}, f)
+                    with open(active_downloads_file, "wb") as f:
+                        f.write(b"{}")
     except Exception as e:
         print(f" [!] Error loading active downloads: {e}")
 
@@ -110,28 +206,122 @@ def load_active_downloads():
 def load_failed_downloads():
     """Load failed downloads from persistent storage."""
     global failed_downloads
+    loaded = {}
     try:
         if os.path.exists(failed_downloads_file):
-            with open(failed_downloads_file, "r") as f:
-                failed_downloads = json.load(f)
-                print(
-                    f" [+] Loaded {len(failed_downloads)} failed downloads from storage"
-                )
+            with open(failed_downloads_file, "rb") as f:
+                loaded = utilities.json_loads(f.read())
+                print(f" [+] Loaded {len(loaded)} failed downloads from storage")
     except Exception as e:
         print(f" [!] Error loading failed downloads: {e}")
-        failed_downloads = {}
+        loaded = {}
+    with failed_downloads_lock:
+        failed_downloads = loaded
+        rebuild_failed_url_index()
+
+
+def rebuild_failed_url_index():
+    """Recompute the URL lookup for failed downloads, keeping the earliest entry per URL.
+
+    The caller holds failed_downloads_lock.
+    """
+    global failed_url_index
+    url_index = {}
+    for download_id, failed_download in failed_downloads.items():
+        url_index.setdefault(failed_download.get("url"), download_id)
+    failed_url_index = url_index
+
+
+def store_failed_download(download_id, failed_download):
+    """Store a failed download and keep the URL lookup in step."""
+    with failed_downloads_lock:
+        replacing = download_id in failed_downloads
+        failed_downloads[download_id] = failed_download
+        if replacing:
+            # A replaced entry keeps its position but may have a different URL
+            rebuild_failed_url_index()
+        else:
+            failed_url_index.setdefault(failed_download.get("url"), download_id)
 
 
 def save_failed_downloads():
+    """Schedule a save of the failed downloads on the background writer thread."""
+    failed_downloads_dirty.set()
+
+
+def write_failed_downloads():
     """Save failed downloads to persistent storage."""
     try:
         os.makedirs(os.path.dirname(failed_downloads_file), exist_ok=True)
-        with open(failed_downloads_file, "w") as f:
-            json.dump(failed_downloads, f, indent=2)
+        # Copy entries under the lock so they can be encoded while other
+        # threads carry on changing the store
+        with failed_downloads_lock:
+            snapshot = {
+                download_id: dict(failed_download)
+                for download_id, failed_download in failed_downloads.items()
+            }
+        # The writer thread and the exit hook may save at the same time
+        with failed_downloads_io_lock:
+            utilities.atomic_write(failed_downloads_file, utilities.json_dumps(snapshot))
     except Exception as e:
         print(f" [!] Error saving failed downloads: {e}")
 
 
+def failed_downloads_writer():
+    """Background thread that writes failed downloads, coalescing bursts of saves."""
+    while True:
+        failed_downloads_dirty.wait()
+        time.sleep(FAILED_DOWNLOADS_SAVE_INTERVAL)
+        failed_downloads_dirty.clear()
+        write_failed_downloads()
+
+
+def handle_sigterm(signum, frame):
+    """Exit through the normal shutdown path so atexit saves still run."""
+    sys.exit(0)
+
+
+def append_jsonl(log_file, entry, keep):
+    """Append an entry to a JSON Lines log, trimming it to the newest `keep` entries.
+
+    The file is only rewritten once it holds twice `keep` lines, so most
+    events cost a single append.
+    """
+    with jsonl_lock:
+        line_count = jsonl_line_counts.get(log_file)
+        if line_count is None:
+            line_count = 0
+            if os.path.exists(log_file):
+                with open(log_file, "rb") as f:
+                    line_count = sum(1 for _ in f)
+
+        with open(log_file, "ab") as f:
+            f.write(utilities.json_dumps(entry, indent=False) + b"\n")
+        line_count += 1
+
+        if line_count > 2 * keep:
+            with open(log_file, "rb") as f:
+                newest = collections.deque(f, maxlen=keep)
+            utilities.atomic_write(log_file, b"".join(newest))
+            line_count = len(newest)
+
+        jsonl_line_counts[log_file] = line_count
+
+
+def write_system_info():
+    """Write SYSTEM_INFO to its sibling log file once it has changed."""
+    global system_info_written
+    # yt-dlp is imported lazily, so its version is only known after the first download
+    if SYSTEM_INFO["yt_dlp_version"] == "unknown" and "yt_dlp" in globals():
+        SYSTEM_INFO["yt_dlp_version"] = getattr(
+            getattr(yt_dlp, "version", None), "__version__", "unknown"
+        )
+    if system_info_written == SYSTEM_INFO:
+        return
+    utilities.atomic_write(system_info_file, utilities.json_dumps(SYSTEM_INFO))
+    system_info_written = dict(SYSTEM_INFO)
+
+
 def add_failed_download(download_id, download_data):
     """Add a failed download to the persistent store with enhanced logging."""
     global failed_downloads
@@ -139,17 +329,13 @@ def add_failed_download(download_id, download_data):
     # Extract URL components for debugging
     url = download_data.get("url", "")
     try:
-        from urllib.parse import urlparse
-
         parsed_url = urlparse(url)
-        domain = parsed_url.netloc
-        path = parsed_url.path
+        domain, path, scheme = parsed_url.netloc, parsed_url.path, parsed_url.scheme
     except Exception:
-        domain = "unknown"
-        path = "unknown"
+        domain = path = scheme = "unknown"
 
     # Create enhanced failed download entry
-    failed_downloads[download_id] = {
+    store_failed_download(download_id, {
         "id": download_id,
         "url": url,
         "domain": domain,
@@ -157,67 +343,32 @@ def add_failed_download(download_id, download_data):
         "title": download_data.get("title"),
         "error": download_data.get("error"),
         "failed_at": time.time(),
-        "failed_at_human": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
         "retry_count": download_data.get("retry_count", 0),
         "open_folder": download_data.get("open_folder", True),
-        "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-        "python_version": sys.version,
-        "yt_dlp_version": getattr(yt_dlp, "version", {}).get("version", "unknown")
-        if "yt_dlp" in globals()
-        else "unknown",
-    }
+    })
 
     # Enhanced logging for developers
     try:
         os.makedirs(".logs", exist_ok=True)
-        developer_log_file = ".logs/failed_downloads_detailed.json"
-
-        # Load existing detailed logs
-        detailed_logs = []
-        if os.path.exists(developer_log_file):
-            try:
-                with open(developer_log_file, "r") as f:
-                    detailed_logs = json.load(f)
-            except Exception:
-                detailed_logs = []
+        write_system_info()
 
         # Add detailed entry for developers
         detailed_entry = {
             "download_id": download_id,
-            "timestamp": time.time(),
-            "timestamp_human": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+            "timestamp": datetime.now(timezone.utc),
             "url": url,
             "domain": domain,
             "title": download_data.get("title"),
             "error_message": download_data.get("error"),
             "retry_count": download_data.get("retry_count", 0),
-            "system_info": {
-                "python_version": sys.version,
-                "platform": sys.platform,
-                "yt_dlp_version": getattr(yt_dlp, "version", {}).get(
-                    "version", "unknown"
-                )
-                if "yt_dlp" in globals()
-                else "unknown",
-            },
             "debugging_info": {
                 "url_path": path,
-                "url_scheme": parsed_url.scheme
-                if "parsed_url" in locals()
-                else "unknown",
-                "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+                "url_scheme": scheme,
             },
         }
 
-        detailed_logs.append(detailed_entry)
-
-        # Keep only the last 50 detailed logs to prevent file from growing too large
-        if len(detailed_logs) > 50:
-            detailed_logs = detailed_logs[-50:]
-
-        # Save detailed logs
-        with open(developer_log_file, "w") as f:
-            json.dump(detailed_logs, f, indent=2)
+        # Keep roughly the last 50 detailed logs to prevent file from growing too large
+        append_jsonl(failed_downloads_detailed_file, detailed_entry, 50)
 
         # Also log to server log with enhanced details
         server_logger.error(
@@ -240,41 +391,36 @@ def add_failed_download(download_id, download_data):
 def remove_failed_download(download_id):
     """Remove a failed download from the persistent store."""
     global failed_downloads
-    if download_id in failed_downloads:
-        del failed_downloads[download_id]
+    with failed_downloads_lock:
+        removed = failed_downloads.pop(download_id, None) is not None
+        if removed:
+            # Another failed download with the same URL may now be the earliest
+            rebuild_failed_url_index()
+    if removed:
         save_failed_downloads()
-        return True
-    return False
+    return removed
 
 
 def find_existing_failed_download(url):
     """Check if a URL already exists in failed downloads."""
     global failed_downloads
-    for download_id, failed_download in failed_downloads.items():
-        if failed_download.get("url") == url:
-            return download_id, failed_download
-    return None, None
+    download_id = failed_url_index.get(url)
+    if download_id is None:
+        return None, None
+    failed_download = failed_downloads.get(download_id)
+    if failed_download is None:
+        return None, None
+    return download_id, failed_download
 
 
 def log_duplicate_attempt(url, title, existing_download_id, existing_download):
     """Log a duplicate download attempt for developer analysis."""
     try:
         os.makedirs(".logs", exist_ok=True)
-        duplicate_log_file = ".logs/duplicate_attempts.json"
-
-        # Load existing duplicate attempts
-        duplicate_attempts = []
-        if os.path.exists(duplicate_log_file):
-            try:
-                with open(duplicate_log_file, "r") as f:
-                    duplicate_attempts = json.load(f)
-            except Exception:
-                duplicate_attempts = []
 
         # Add new duplicate attempt
         duplicate_entry = {
-            "timestamp": time.time(),
-            "timestamp_human": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+            "timestamp": datetime.now(timezone.utc),
             "attempted_url": url,
             "attempted_title": title,
             "existing_download_id": existing_download_id,
@@ -284,15 +430,8 @@ def log_duplicate_attempt(url, title, existing_download_id, existing_download):
             "existing_retry_count": existing_download.get("retry_count", 0),
         }
 
-        duplicate_attempts.append(duplicate_entry)
-
-        # Keep only the last 100 attempts to prevent file from growing too large
-        if len(duplicate_attempts) > 100:
-            duplicate_attempts = duplicate_attempts[-100:]
-
-        # Save duplicate attempts log
-        with open(duplicate_log_file, "w") as f:
-            json.dump(duplicate_attempts, f, indent=2)
+        # Keep roughly the last 100 attempts to prevent file from growing too large
+        append_jsonl(duplicate_attempts_file, duplicate_entry, 100)
 
         # Also log to server log
         server_logger.warning(
@@ -311,6 +450,17 @@ def log_duplicate_attempt(url, title, existing_download_id, existing_download):
         server_logger.error(f"Error logging duplicate attempt: {e}")
 
 
+def list_download_dir(download_path):
+    """List a download folder, reusing a listing taken within DIR_LISTING_TTL."""
+    now = time.monotonic()
+    cached = dir_listings.get(download_path)
+    if cached is not None and now - cached[0] < DIR_LISTING_TTL:
+        return cached[1]
+    names = tuple(os.listdir(download_path))
+    dir_listings[download_path] = (now, names)
+    return names
+
+
 def get_partial_files(download_id, title):
     """Get partial files (.part, .ytdl) for a download."""
     try:
@@ -318,7 +468,7 @@ def get_partial_files(download_id, title):
         partial_files = []
 
         # Look for files with the download_id or title in name
-        for file_name in os.listdir(download_path):
+        for file_name in list_download_dir(download_path):
             if (
                 download_id in file_name
                 or (
@@ -329,11 +479,7 @@ def get_partial_files(download_id, title):
                         if len(word) > 3
                     )
                 )
-                and (
-                    file_name.endswith(".part")
-                    or file_name.endswith(".ytdl")
-                    or file_name.endswith(".temp")
-                )
+                and file_name.endswith(PARTIAL_FILE_SUFFIXES)
             ):
                 partial_files.append(os.path.join(download_path, file_name))
 
@@ -357,63 +503,101 @@ def cleanup_partial_files(download_id, title):
             except Exception as e:
                 print(f" [!] Error removing {file_path}: {e}")
 
+        if removed_files:
+            # Don't serve the removed files from a cached listing
+            dir_listings.pop(os.path.dirname(partial_files[0]), None)
+
         return removed_files
     except Exception as e:
         print(f" [!] Error cleaning up partial files: {e}")
         return []
 
 
+def path_is_within(path, root):
+    """Whether absolute path is root or inside it, not merely sharing its prefix."""
+    try:
+        return os.path.commonpath([root, path]) == root
+    except ValueError:  # Paths on different drives (Windows)
+        return False
+
+
+def clean_match_text(text):
+    """Lowercase text and strip punctuation for fuzzy matching."""
+    text = text.lower()
+    if text.isascii():
+        return text.translate(MATCH_STRIP_TABLE).strip()
+    # Non-ASCII titles keep their Unicode letters, which the table can't express
+    return MATCH_STRIP_PATTERN.sub("", text).strip()
+
+
+@functools.lru_cache(maxsize=1024)
+def clean_match_title(title):
+    """Get a title's cleaned form and word set, cached across match calls."""
+    clean_title = clean_match_text(title)
+    return clean_title, frozenset(clean_title.split())
+
+
 def find_matching_failed_download(filename):
     """Find a failed download that matches a partial file using multiple matching strategies."""
     global failed_downloads
 
     # Clean filename for comparison (remove extensions and special chars)
-    clean_filename = (
-        filename.replace(".part", "").replace(".ytdl", "").replace(".temp", "").lower()
+    clean_filename = clean_match_text(
+        filename.replace(".part", "").replace(".ytdl", "").replace(".temp", "")
     )
-    clean_filename = re.sub(r"[^\w\s-]", "", clean_filename).strip()
+    filename_words = set(clean_filename.split())
+    filename_word_count = len(filename_words)
 
     best_match = None
     best_similarity = 0
+    # Per-candidate tracing is costly on long lists; only build it when wanted
+    trace = server_logger.isEnabledFor(logging.DEBUG)
 
-    print(f" [+] Searching for match to: '{clean_filename}'")
+    if trace:
+        server_logger.debug(f" [+] Searching for match to: '{clean_filename}'")
 
-    for download_id, failed_download in failed_downloads.items():
+    for download_id, failed_download in list(failed_downloads.items()):
         # Clean the failed download title for comparison
-        clean_title = failed_download["title"].lower()
-        clean_title = re.sub(r"[^\w\s-]", "", clean_title).strip()
+        clean_title, title_words = clean_match_title(failed_download["title"])
 
-        print(f" [+] Comparing with: '{clean_title}'")
+        if trace:
+            server_logger.debug(f" [+] Comparing with: '{clean_title}'")
 
         # Strategy 1: Exact match (after cleaning)
         if clean_filename == clean_title:
-            print(f" [+] Exact match found!")
+            if trace:
+                server_logger.debug(f" [+] Exact match found!")
             return (download_id, failed_download)
 
         # Strategy 2: Substring containment (bidirectional)
         if clean_title in clean_filename or clean_filename in clean_title:
             similarity = 0.99
-            print(f" [+] Substring match found (similarity: {similarity})")
+            if trace:
+                server_logger.debug(f" [+] Substring match found (similarity: {similarity})")
         else:
             # Strategy 3: Word-based similarity
-            filename_words = set(clean_filename.split())
-            title_words = set(clean_title.split())
-
             if not filename_words or not title_words:
                 continue
 
+            # Jaccard similarity can't exceed the ratio of the set sizes, so
+            # titles far longer or shorter than the filename can never match
+            title_word_count = len(title_words)
+            if min(filename_word_count, title_word_count) < 0.80 * max(
+                filename_word_count, title_word_count
+            ):
+                continue
+
             # Calculate Jaccard similarity (intersection over union)
-            intersection = len(filename_words.intersection(title_words))
-            union = len(filename_words.union(title_words))
+            intersection = len(filename_words & title_words)
+            # Size of the union without building it
+            union = filename_word_count + title_word_count - intersection
             similarity = intersection / union if union > 0 else 0
 
-            print(f" [+] Word similarity: {similarity:.2f}")
+            if trace:
+                server_logger.debug(f" [+] Word similarity: {similarity:.2f}")
 
         # Strategy 4: Check if most words from filename are in title (lowered threshold)
         if similarity == 0:  # Only if no other similarity found
-            filename_words = set(clean_filename.split())
-            title_words = set(clean_title.split())
-
             if filename_words and title_words:
                 # Check what percentage of filename words are in title
                 words_in_title = len(filename_words.intersection(title_words))
@@ -424,18 +608,21 @@ def find_matching_failed_download(filename):
                 # If 80%+ of filename words are in title, consider it a match
                 if filename_coverage >= 0.8:
                     similarity = 0.85
-                    print(f" [+] High filename coverage match: {filename_coverage:.2f}")
+                    if trace:
+                        server_logger.debug(f" [+] High filename coverage match: {filename_coverage:.2f}")
 
         # Update best match if this is better (lowered threshold to 80%)
         if similarity > best_similarity and similarity >= 0.80:
             best_similarity = similarity
             best_match = (download_id, failed_download)
-            print(f" [+] New best match: {similarity:.2f}")
+            if trace:
+                server_logger.debug(f" [+] New best match: {similarity:.2f}")
 
-    if best_match:
-        print(f" [+] Final match selected with similarity: {best_similarity:.2f}")
-    else:
-        print(f" [-] No match found (threshold: 0.80)")
+    if trace:
+        if best_match:
+            server_logger.debug(f" [+] Final match selected with similarity: {best_similarity:.2f}")
+        else:
+            server_logger.debug(f" [-] No match found (threshold: 0.80)")
 
     return best_match
 
@@ -445,21 +632,25 @@ def find_matching_active_download(filename):
     global active_downloads
 
     # Clean filename for comparison (remove extensions and special chars)
-    clean_filename = (
-        filename.replace(".part", "").replace(".ytdl", "").replace(".temp", "").lower()
+    clean_filename = clean_match_text(
+        filename.replace(".part", "").replace(".ytdl", "").replace(".temp", "")
     )
-    clean_filename = re.sub(r"[^\w\s-]", "", clean_filename).strip()
+    filename_words = set(clean_filename.split())
+    filename_word_count = len(filename_words)
 
     best_match = None
     best_similarity = 0
+    # Per-candidate tracing is costly on long lists; only build it when wanted
+    trace = server_logger.isEnabledFor(logging.DEBUG)
 
-    print(f" [+] Searching active downloads for match to: '{clean_filename}'")
+    if trace:
+        server_logger.debug(f" [+] Searching active downloads for match to: '{clean_filename}'")
 
     # Load active downloads if they exist
     try:
         if os.path.exists(active_downloads_file):
-            with open(active_downloads_file, "r") as f:
-                active_downloads_data = json.load(f)
+            with open(active_downloads_file, "rb") as f:
+                active_downloads_data = utilities.json_loads(f.read())
         else:
             active_downloads_data = {}
     except Exception as e:
@@ -483,130 +674,146 @@ def find_matching_active_download(filename):
             continue
 
         # Clean the active download title for comparison
-        clean_title = active_download.get("title", "").lower()
-        clean_title = re.sub(r"[^\w\s-]", "", clean_title).strip()
+        clean_title, title_words = clean_match_title(active_download.get("title", ""))
 
-        print(f" [+] Comparing with active: '{clean_title}'")
+        if trace:
+            server_logger.debug(f" [+] Comparing with active: '{clean_title}'")
 
         # Strategy 1: Exact match (after cleaning)
         if clean_filename == clean_title:
-            print(f" [+] Exact match found in active downloads!")
+            if trace:
+                server_logger.debug(f" [+] Exact match found in active downloads!")
             return (download_id, active_download)
 
         # Strategy 2: Substring containment (bidirectional)
         if clean_title in clean_filename or clean_filename in clean_title:
             similarity = 0.99
-            print(f" [+] Substring match found in active (similarity: {similarity})")
+            if trace:
+                server_logger.debug(f" [+] Substring match found in active (similarity: {similarity})")
         else:
             # Strategy 3: Word-based similarity
-            filename_words = set(clean_filename.split())
-            title_words = set(clean_title.split())
-
             if not filename_words or not title_words:
                 continue
 
+            # Jaccard similarity can't exceed the ratio of the set sizes, so
+            # titles far longer or shorter than the filename can never match
+            title_word_count = len(title_words)
+            if min(filename_word_count, title_word_count) < 0.80 * max(
+                filename_word_count, title_word_count
+            ):
+                continue
+
             # Calculate Jaccard similarity (intersection over union)
-            intersection = len(filename_words.intersection(title_words))
-            union = len(filename_words.union(title_words))
+            intersection = len(filename_words & title_words)
+            union = filename_word_count + title_word_count - intersection
             similarity = intersection / union if union > 0 else 0
 
-            print(f" [+] Word similarity: {similarity:.2f}")
+            if trace:
+                server_logger.debug(f" [+] Word similarity: {similarity:.2f}")
 
         # Strategy 4: Check if most words from filename are in title
         if similarity == 0:  # Only if no other similarity found
-            filename_words = set(clean_filename.split())
-            title_words = set(clean_title.split())
-
             if filename_words and title_words:
                 matching_words = len(filename_words.intersection(title_words))
                 if (
                     matching_words >= len(filename_words) * 0.5
                 ):  # At least 50% of words match
                     similarity = 0.85
-                    print(
-                        f" [+] Partial word match: {matching_words}/{len(filename_words)} words"
-                    )
+                    if trace:
+                        server_logger.debug(
+                            f" [+] Partial word match: {matching_words}/{len(filename_words)} words"
+                        )
 
         # Use same lowered threshold as failed downloads (0.80)
         if similarity >= 0.80 and similarity > best_similarity:
             best_similarity = similarity
             best_match = (download_id, active_download)
-            print(f" [+] New best active match: {similarity:.2f}")
+            if trace:
+                server_logger.debug(f" [+] New best active match: {similarity:.2f}")
 
-    if best_match:
-        print(
-            f" [+] Final active match selected with similarity: {best_similarity:.2f}"
-        )
-    else:
-        print(f" [-] No active match found (threshold: 0.80)")
+    if trace:
+        if best_match:
+            server_logger.debug(
+                f" [+] Final active match selected with similarity: {best_similarity:.2f}"
+            )
+        else:
+            server_logger.debug(f" [-] No active match found (threshold: 0.80)")
 
     return best_match
 
 
 def get_video_duration(file_path):
-    """Get video duration in seconds using ffprobe or fallback methods."""
-    try:
-        # Try using ffprobe first (most accurate)
-        import subprocess
+    """Get video duration in seconds using ffprobe or fallback methods.
 
-        result = subprocess.run(
-            [
-                "ffprobe",
-                "-v",
-                "quiet",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "csv=p=0",
-                file_path,
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
+    Results are cached per file version, keyed on path, mtime and size.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return _video_duration(file_path, stat.st_mtime_ns, stat.st_size)
 
-        if result.returncode == 0 and result.stdout.strip():
-            duration = float(result.stdout.strip())
-            return round(duration)
-    except (
-        subprocess.SubprocessError,
-        subprocess.TimeoutExpired,
-        ValueError,
-        FileNotFoundError,
-    ) as e:
-        pass
 
-    try:
-        # Fallback: try mediainfo if available
-        result = subprocess.run(
-            ["mediainfo", "--Inform=General;%Duration%", file_path],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
+@functools.lru_cache(maxsize=512)
+def _video_duration(file_path, mtime_ns, file_size):
+    """Probe a video's duration; mtime_ns and file_size only key the cache."""
+    if FFPROBE_PATH:
+        try:
+            # Try using ffprobe first (most accurate)
+            result = subprocess.run(
+                [
+                    FFPROBE_PATH,
+                    "-v",
+                    "quiet",
+                    "-show_entries",
+                    "format=duration",
+                    "-of",
+                    "csv=p=0",
+                    file_path,
+                ],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
 
-        if result.returncode == 0 and result.stdout.strip():
-            duration_ms = float(result.stdout.strip())
-            return round(duration_ms / 1000)  # Convert ms to seconds
-    except (
-        subprocess.SubprocessError,
-        subprocess.TimeoutExpired,
-        ValueError,
-        FileNotFoundError,
-    ):
-        pass
+            if result.returncode == 0 and result.stdout.strip():
+                duration = float(result.stdout.strip())
+                return round(duration)
+        except (
+            subprocess.SubprocessError,
+            subprocess.TimeoutExpired,
+            ValueError,
+            FileNotFoundError,
+        ) as e:
+            pass
+
+    if MEDIAINFO_PATH:
+        try:
+            # Fallback: try mediainfo if available
+            result = subprocess.run(
+                [MEDIAINFO_PATH, "--Inform=General;%Duration%", file_path],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
 
-    try:
-        # Another fallback: try using file size estimation (very rough)
-        # Most videos are roughly 1MB per minute for standard quality
-        file_size = os.path.getsize(file_path)
-        if file_size > 10 * 1024 * 1024:  # Only for files > 10MB
-            estimated_minutes = file_size / (1024 * 1024)  # Rough estimate
-            if estimated_minutes < 300:  # Cap at 5 hours to avoid crazy estimates
-                return round(estimated_minutes * 60)
-    except Exception as e:
-        # Silently fail for duration parsing as it's non-critical
-        pass
+            if result.returncode == 0 and result.stdout.strip():
+                duration_ms = float(result.stdout.strip())
+                return round(duration_ms / 1000)  # Convert ms to seconds
+        except (
+            subprocess.SubprocessError,
+            subprocess.TimeoutExpired,
+            ValueError,
+            FileNotFoundError,
+        ):
+            pass
+
+    # Another fallback: try using file size estimation (very rough)
+    # Most videos are roughly 1MB per minute for standard quality
+    if file_size > 10 * 1024 * 1024:  # Only for files > 10MB
+        estimated_minutes = file_size / (1024 * 1024)  # Rough estimate
+        if estimated_minutes < 300:  # Cap at 5 hours to avoid crazy estimates
+            return round(estimated_minutes * 60)
 
     return None
 
@@ -619,40 +826,41 @@ def auto_cleanup_matching_partial_files(completed_title):
             return []
 
         removed_files = []
-        clean_completed_title = completed_title.lower()
-        clean_completed_title = re.sub(r"[^\w\s-]", "", clean_completed_title).strip()
+        clean_completed_title, title_words = clean_match_title(completed_title)
+        title_word_count = len(title_words)
 
-        for filename in os.listdir(download_path):
-            if (
-                filename.endswith(".part")
-                or filename.endswith(".ytdl")
-                or filename.endswith(".temp")
-            ):
+        for filename in list_download_dir(download_path):
+            if filename.endswith(PARTIAL_FILE_SUFFIXES):
                 # Check if this partial file matches the completed download
-                clean_filename = (
+                clean_filename = clean_match_text(
                     filename.replace(".part", "")
                     .replace(".ytdl", "")
                     .replace(".temp", "")
-                    .lower()
                 )
-                clean_filename = re.sub(r"[^\w\s-]", "", clean_filename).strip()
 
                 # Calculate similarity
                 filename_words = set(clean_filename.split())
-                title_words = set(clean_completed_title.split())
 
                 if not filename_words or not title_words:
                     continue
 
-                intersection = len(filename_words.intersection(title_words))
-                union = len(filename_words.union(title_words))
-                similarity = intersection / union if union > 0 else 0
-
                 # Also check if the title is contained in filename or vice versa
-                if (
+                contained = (
                     clean_completed_title in clean_filename
                     or clean_filename in clean_completed_title
+                )
+
+                # Skip files whose word count alone rules out a 98% match
+                filename_word_count = len(filename_words)
+                if not contained and min(filename_word_count, title_word_count) < 0.98 * max(
+                    filename_word_count, title_word_count
                 ):
+                    continue
+
+                intersection = len(filename_words & title_words)
+                union = filename_word_count + title_word_count - intersection
+                similarity = intersection / union if union > 0 else 0
+                if contained:
                     similarity = max(similarity, 0.98)
 
                 if similarity >= 0.98:  # 98% match threshold
@@ -666,6 +874,9 @@ def auto_cleanup_matching_partial_files(completed_title):
                     except Exception as e:
                         print(f" [!] Error auto-cleaning partial file {filename}: {e}")
 
+        if removed_files:
+            dir_listings.pop(download_path, None)
+
         return removed_files
     except Exception as e:
         print(f" [!] Error in auto_cleanup_matching_partial_files: {e}")
@@ -815,7 +1026,8 @@ def setup_logging():
 
     # Create logger
     logger = logging.getLogger("quikvid_server")
-    logger.setLevel(logging.DEBUG)
+    # Match tracing is logged at DEBUG; lower this to see it
+    logger.setLevel(logging.INFO)
 
     # Remove existing handlers to avoid duplicates
     for handler in logger.handlers[:]:
@@ -856,6 +1068,25 @@ server_logger = setup_logging()
 class DownloadProgress:
     """Track download progress and status."""
 
+    __slots__ = (
+        "download_id",
+        "url",
+        "title",
+        "status",
+        "percent",
+        "speed",
+        "eta",
+        "error",
+        "cancelled",
+        "process",
+        "download_thread",
+        "start_time",
+        "retry_count",
+        "open_folder",
+        "partial_files",
+        "url_track_id",  # Only set once the URL is tracked
+    )
+
     def __init__(self, download_id, url, title, retry_count=0):
         self.download_id = download_id
         self.url = url
@@ -874,6 +1105,19 @@ class DownloadProgress:
         self.partial_files = []
 
 
+def encode_download_progress(obj):
+    """JSON default hook that saves a DownloadProgress as its persisted fields."""
+    if isinstance(obj, DownloadProgress):
+        return {
+            "title": obj.title,
+            "url": obj.url,
+            "status": obj.status,
+            "percent": obj.percent,
+            "start_time": obj.start_time,
+        }
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 class QuikvidHandler(BaseHTTPRequestHandler):
     """HTTP request handler for Quikvid-DL API."""
 
@@ -887,119 +1131,102 @@ class QuikvidHandler(BaseHTTPRequestHandler):
 
     def do_GET(self):
         """Handle GET requests."""
-        parsed_path = urlparse(self.path)
-
-        if parsed_path.path == "/status":
-            self.send_json_response(
-                {"status": "running", "message": "Quikvid-DL server is active"}
-            )
-        elif parsed_path.path.startswith("/progress/"):
-            download_id = parsed_path.path.split("/")[-1]
-            self.handle_progress_request(download_id)
-        elif parsed_path.path == "/current-folder":
-            self.handle_current_folder_request()
-        elif parsed_path.path == "/debug":
-            self.handle_debug_request()
-        elif parsed_path.path == "/uninstall":
-            self.handle_uninstall_request()
-        elif parsed_path.path == "/browse-downloads":
-            self.handle_browse_downloads_request()
-        elif parsed_path.path.startswith("/open-file/"):
-            self.handle_open_file_request()
-        elif parsed_path.path.startswith("/stream-video/"):
-            self.handle_stream_video_request()
-        elif parsed_path.path.startswith("/find-failed-download-for-file/"):
-            filename = parsed_path.path.split("/")[-1]
-            self.handle_find_failed_download_request(filename)
-        elif parsed_path.path == "/favicon.ico":
-            # Serve the new favicon.ico
-            try:
-                favicon_path = os.path.join(
-                    os.getcwd(), "static", "favicons", "favicon.ico"
-                )
-                if os.path.exists(favicon_path):
-                    self.send_response(200)
-                    self.send_header("Content-Type", "image/x-icon")
-                    self.send_header("Cache-Control", "public, max-age=3600")
-                    self.end_headers()
-
-                    with open(favicon_path, "rb") as f:
-                        self.wfile.write(f.read())
-                else:
-                    self.send_error(404, "Favicon not found")
-            except Exception as e:
-                print(f"Error serving favicon: {e}")
-                self.send_error(500, "Internal server error")
-        elif parsed_path.path.startswith("/static/"):
-            # Serve static files (favicons, etc.)
-            self.serve_static_file(parsed_path.path)
-        elif parsed_path.path == "/api/metadata":
-            self.handle_get_metadata_request()
-        elif parsed_path.path == "/":
-            self.send_html_response(self.get_web_interface())
-        else:
-            self.send_error(404, "Not Found")
+        self.dispatch(self.GET_ROUTES, self.GET_PREFIX_ROUTES)
 
     def do_POST(self):
         """Handle POST requests."""
-        parsed_path = urlparse(self.path)
-
-        if parsed_path.path == "/download":
-            self.handle_download_request()
-        elif parsed_path.path.startswith("/cancel/"):
-            download_id = parsed_path.path.split("/")[-1]
-            self.handle_cancel_request(download_id)
-        elif parsed_path.path.startswith("/retry/"):
-            download_id = parsed_path.path.split("/")[-1]
-            self.handle_retry_request(download_id)
-        elif parsed_path.path.startswith("/delete/"):
-            download_id = parsed_path.path.split("/")[-1]
-            self.handle_delete_request(download_id)
-        elif parsed_path.path.startswith("/clear/"):
-            download_id = parsed_path.path.split("/")[-1]
-            self.handle_clear_request(download_id)
-        elif parsed_path.path.startswith("/delete-partial-file/"):
-            filename = parsed_path.path.split("/")[-1]
-            self.handle_delete_partial_file_request(filename)
-        elif parsed_path.path.startswith("/find-failed-download-for-file/"):
-            filename = parsed_path.path.split("/")[-1]
-            self.handle_find_failed_download_request(filename)
-        elif parsed_path.path == "/select-folder":
-            self.handle_folder_selection_request()
-        elif parsed_path.path == "/open-folder":
-            self.handle_open_folder_request()
-        elif parsed_path.path == "/stop-server":
-            self.handle_stop_server_request()
-        elif parsed_path.path == "/api/metadata/person-name":
-            self.handle_save_person_name_request()
-        elif parsed_path.path == "/api/metadata/tags":
-            self.handle_save_tags_request()
-        elif parsed_path.path == "/api/metadata/rating":
-            self.handle_save_rating_request()
-        elif parsed_path.path == "/api/metadata/import":
-            self.handle_import_metadata_request()
-        else:
-            self.send_error(404, "Not Found")
-
-    def handle_progress_request(self, download_id):
-        """Handle progress check requests."""
-        with download_lock:
-            if download_id not in active_downloads:
-                self.send_json_response({"error": "Download not found"}, status=404)
+        self.dispatch(self.POST_ROUTES, self.POST_PREFIX_ROUTES)
+
+    def dispatch(self, routes, prefix_routes):
+        """Call the route for the request path: one dict lookup, then the few prefixes."""
+        path = urlparse(self.path).path
+        route = routes.get(path)
+        if route is None:
+            for prefix, prefix_route in prefix_routes:
+                if path.startswith(prefix):
+                    route = prefix_route
+                    break
+            else:
+                self.send_error(404, "Not Found")
                 return
+        route(self, path)
+
+    # Routes take (handler, path); IDs and filenames are the last path segment
+    GET_ROUTES = {
+        "/status": lambda self, path: self.send_json_bytes(STATUS_RESPONSE_BODY),
+        "/current-folder": lambda self, path: self.handle_current_folder_request(),
+        "/debug": lambda self, path: self.handle_debug_request(),
+        "/uninstall": lambda self, path: self.handle_uninstall_request(),
+        "/browse-downloads": lambda self, path: self.handle_browse_downloads_request(),
+        "/favicon.ico": lambda self, path: self.handle_favicon_request(),
+        "/api/metadata": lambda self, path: self.handle_get_metadata_request(),
+        "/": lambda self, path: self.send_html_response(self.get_web_interface_page()),
+    }
+    GET_PREFIX_ROUTES = (
+        ("/progress/", lambda self, path: self.handle_progress_request(path.rpartition("/")[2])),
+        ("/open-file/", lambda self, path: self.handle_open_file_request()),
+        ("/stream-video/", lambda self, path: self.handle_stream_video_request()),
+        ("/find-failed-download-for-file/",
+         lambda self, path: self.handle_find_failed_download_request(path.rpartition("/")[2])),
+        # Serve static files (favicons, etc.)
+        ("/static/", lambda self, path: self.serve_static_file(path)),
+    )
+    POST_ROUTES = {
+        "/download": lambda self, path: self.handle_download_request(),
+        "/select-folder": lambda self, path: self.handle_folder_selection_request(),
+        "/open-folder": lambda self, path: self.handle_open_folder_request(),
+        "/stop-server": lambda self, path: self.handle_stop_server_request(),
+        "/api/metadata/person-name": lambda self, path: self.handle_save_person_name_request(),
+        "/api/metadata/tags": lambda self, path: self.handle_save_tags_request(),
+        "/api/metadata/rating": lambda self, path: self.handle_save_rating_request(),
+        "/api/metadata/import": lambda self, path: self.handle_import_metadata_request(),
+    }
+    POST_PREFIX_ROUTES = (
+        ("/cancel/", lambda self, path: self.handle_cancel_request(path.rpartition("/")[2])),
+        ("/retry/", lambda self, path: self.handle_retry_request(path.rpartition("/")[2])),
+        ("/delete/", lambda self, path: self.handle_delete_request(path.rpartition("/")[2])),
+        ("/clear/", lambda self, path: self.handle_clear_request(path.rpartition("/")[2])),
+        ("/delete-partial-file/",
+         lambda self, path: self.handle_delete_partial_file_request(path.rpartition("/")[2])),
+        ("/find-failed-download-for-file/",
+         lambda self, path: self.handle_find_failed_download_request(path.rpartition("/")[2])),
+    )
 
-            progress = active_downloads[download_id]
-            self.send_json_response(
-                {
-                    "downloadId": download_id,
-                    "status": progress.status,
-                    "percent": progress.percent,
-                    "speed": progress.speed,
-                    "eta": progress.eta,
-                    "error": progress.error,
-                    "title": progress.title,
-                }
+    def handle_favicon_request(self):
+        """Serve the favicon."""
+        try:
+            favicon_path = os.path.join(
+                os.getcwd(), "static", "favicons", "favicon.ico"
             )
+            if os.path.exists(favicon_path):
+                self.send_static_file(favicon_path, "image/x-icon")
+            else:
+                self.send_error(404, "Favicon not found")
+        except Exception as e:
+            print(f"Error serving favicon: {e}")
+            self.send_error(500, "Internal server error")
+
+    def handle_progress_request(self, download_id):
+        """Handle progress check requests."""
+        # No download_lock: a dict lookup and attribute reads are atomic, and
+        # download threads update these fields without the lock anyway, so
+        # holding it would only make pollers wait on each other and on writers
+        progress = active_downloads.get(download_id)
+        if progress is None:
+            self.send_json_response({"error": "Download not found"}, status=404)
+            return
+
+        self.send_json_response(
+            {
+                "downloadId": download_id,
+                "status": progress.status,
+                "percent": progress.percent,
+                "speed": progress.speed,
+                "eta": progress.eta,
+                "error": progress.error,
+                "title": progress.title,
+            }
+        )
 
     def handle_retry_request(self, download_id):
         """Handle download retry requests."""
@@ -1206,11 +1433,11 @@ class QuikvidHandler(BaseHTTPRequestHandler):
             filename = urllib.parse.unquote(filename)
 
             # Construct full file path
-            downloads_path = config.get_video_download_path()
-            file_path = os.path.join(downloads_path, filename)
+            downloads_root = config.get_video_download_root()
+            file_path = os.path.abspath(os.path.join(downloads_root, filename))
 
             # Security check - ensure the file is in the downloads directory
-            if not file_path.startswith(downloads_path):
+            if not path_is_within(file_path, downloads_root):
                 self.send_json_response(
                     {"success": False, "message": "Invalid file path"}, status=400
                 )
@@ -1449,7 +1676,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
                 debug_info["downloads"].append(download_info)
 
             # Add failed downloads that aren't currently active and not duplicates
-            for download_id, failed_download in failed_downloads.items():
+            for download_id, failed_download in list(failed_downloads.items()):
                 if download_id not in active_downloads:
                     # Create unique key based on title and URL
                     item_key = (failed_download["title"], failed_download["url"])
@@ -1812,8 +2039,8 @@ class QuikvidHandler(BaseHTTPRequestHandler):
             static_root = os.path.join(os.getcwd(), "static")
             file_path = os.path.join(static_root, path.lstrip("/static/"))
 
-            # Ensure the file is within the static directory
-            if not os.path.abspath(file_path).startswith(os.path.abspath(static_root)):
+            # Ensure the file is within the static directory (static_root is already absolute)
+            if not path_is_within(os.path.abspath(file_path), static_root):
                 self.send_error(403, "Access denied")
                 return
 
@@ -1832,18 +2059,25 @@ class QuikvidHandler(BaseHTTPRequestHandler):
             elif file_path.endswith(".svg"):
                 content_type = "image/svg+xml"
 
-            self.send_response(200)
-            self.send_header("Content-Type", content_type)
-            self.send_header("Cache-Control", "public, max-age=3600")
-            self.end_headers()
-
-            with open(file_path, "rb") as f:
-                self.wfile.write(f.read())
+            self.send_static_file(file_path, content_type)
 
         except Exception as e:
             print(f"Error serving static file {path}: {e}")
             self.send_error(500, "Internal server error")
 
+    def send_static_file(self, file_path, content_type):
+        """Send a cacheable file, letting the kernel copy it straight to the socket."""
+        with open(file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(size))
+            self.send_header("Cache-Control", "public, max-age=3600")
+            self.end_headers()
+            # socket.sendfile uses os.sendfile where available and falls back
+            # to plain sends elsewhere
+            self.connection.sendfile(f)
+
     def handle_open_file_request(self):
         """Handle requests to open a specific file."""
         try:
@@ -1881,8 +2115,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
 
             # Security check - ensure the resolved path is within the download directory
             file_path = os.path.abspath(file_path)
-            download_path = os.path.abspath(download_path)
-            if not file_path.startswith(download_path):
+            if not path_is_within(file_path, config.get_video_download_root()):
                 self.send_json_response({"status": "error", "message": "Access denied"})
                 return
 
@@ -1940,8 +2173,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
             # Security check - ensure the resolved path is within the download directory
             # This prevents directory traversal attacks
             file_path = os.path.abspath(file_path)
-            download_path = os.path.abspath(download_path)
-            if not file_path.startswith(download_path):
+            if not path_is_within(file_path, config.get_video_download_root()):
                 self.send_error(403, "Access denied")
                 return
 
@@ -2054,7 +2286,13 @@ class QuikvidHandler(BaseHTTPRequestHandler):
                         ]:
                             progress.cancelled = True
                             progress.status = "cancelled"
-                    save_active_downloads()
+
+                # Write everything now: the SIGTERM below can end the process
+                # before the writer threads or atexit handlers get to run
+                write_active_downloads()
+                write_failed_downloads()
+                get_tracker().flush()
+                get_video_metadata().flush()
 
                 # Terminate all child processes
                 import signal
@@ -2312,13 +2550,14 @@ class QuikvidHandler(BaseHTTPRequestHandler):
                 )
 
                 # Instead of creating a new download, increment retry count and update the existing one
-                existing_download["retry_count"] = (
-                    existing_download.get("retry_count", 0) + 1
-                )
-                existing_download["last_retry_attempt"] = time.time()
-                existing_download["last_retry_title"] = (
-                    title  # Update title in case it changed
-                )
+                with failed_downloads_lock:
+                    existing_download["retry_count"] = (
+                        existing_download.get("retry_count", 0) + 1
+                    )
+                    existing_download["last_retry_attempt"] = time.time()
+                    existing_download["last_retry_title"] = (
+                        title  # Update title in case it changed
+                    )
                 save_failed_downloads()
 
                 # Return a response indicating this is a retry of an existing failed download
@@ -2384,6 +2623,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
 
     def download_video_with_progress(self, progress, open_folder):
         """Download video with progress tracking."""
+        _ensure_ytdlp()
         try:
             download_path = config.get_video_download_path()
 
@@ -2412,6 +2652,10 @@ class QuikvidHandler(BaseHTTPRequestHandler):
                     "retries": 5,  # Retry 5 times on failure
                     "fragment_retries": 5,  # Retry fragments 5 times
                     "file_access_retries": 3,  # Retry file access
+                    # Fetch HLS/DASH fragments in parallel
+                    "concurrent_fragment_downloads": config.get_site_config(
+                        progress.url
+                    ).get("concurrent_fragments", 4),
                     "verbose": True,  # Add verbose logging
                     "no_warnings": False,  # Show warnings
                     # Anti-detection measures
@@ -2420,17 +2664,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
                     "sleep_interval": 1,  # General sleep interval
                     # Realistic browser headers to avoid detection
                     "http_headers": {
-                        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-                        "Accept-Language": "en-US,en;q=0.9",
-                        "Accept-Encoding": "gzip, deflate, br",
-                        "Connection": "keep-alive",
-                        "Upgrade-Insecure-Requests": "1",
-                        "Sec-Fetch-Dest": "document",
-                        "Sec-Fetch-Mode": "navigate",
-                        "Sec-Fetch-Site": "none",
-                        "Sec-Fetch-User": "?1",
-                        "Cache-Control": "max-age=0",
+                        **DOWNLOAD_HTTP_HEADERS,
                         "Referer": progress.url,  # Set referer to the video page
                     },
                     # Cookie handling for session management
@@ -2619,18 +2853,12 @@ class QuikvidHandler(BaseHTTPRequestHandler):
                 ):
                     print(f" [+] Attempting manual XHamster extraction...")
                     try:
-                        import requests
-                        import re
-
-                        # Get page content
-                        response = requests.get(
+                        # Get page content over the shared keep-alive client
+                        page_text = videoDownloader.fetch_page_text(
                             progress.url,
-                            headers={
+                            {
                                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-                                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                                "Accept-Language": "en-US,en;q=0.9",
                             },
-                            timeout=30,
                         )
 
                         # Extract M3U8 video URL patterns from XHamster
@@ -2642,7 +2870,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
 
                         video_url = None
                         for pattern in m3u8_patterns:
-                            matches = re.findall(pattern, response.text, re.IGNORECASE)
+                            matches = re.findall(pattern, page_text, re.IGNORECASE)
                             if matches:
                                 video_url = (
                                     matches[0]
@@ -2656,7 +2884,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
 
                         # Extract title from page
                         title_match = re.search(
-                            r"<title[^>]*>([^<]+)</title>", response.text, re.IGNORECASE
+                            r"<title[^>]*>([^<]+)</title>", page_text, re.IGNORECASE
                         )
                         video_title = "XHamster_Video"
                         if title_match:
@@ -2742,18 +2970,12 @@ class QuikvidHandler(BaseHTTPRequestHandler):
                         f" [+] Attempting manual XHamster extraction for download error..."
                     )
                     try:
-                        import requests
-                        import re
-
-                        # Get page content
-                        response = requests.get(
+                        # Get page content over the shared keep-alive client
+                        page_text = videoDownloader.fetch_page_text(
                             progress.url,
-                            headers={
+                            {
                                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-                                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                                "Accept-Language": "en-US,en;q=0.9",
                             },
-                            timeout=30,
                         )
 
                         # Extract M3U8 video URL patterns from XHamster
@@ -2765,7 +2987,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
 
                         video_url = None
                         for pattern in m3u8_patterns:
-                            matches = re.findall(pattern, response.text, re.IGNORECASE)
+                            matches = re.findall(pattern, page_text, re.IGNORECASE)
                             if matches:
                                 video_url = (
                                     matches[0]
@@ -2779,7 +3001,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
 
                         # Extract title from page
                         title_match = re.search(
-                            r"<title[^>]*>([^<]+)</title>", response.text, re.IGNORECASE
+                            r"<title[^>]*>([^<]+)</title>", page_text, re.IGNORECASE
                         )
                         video_title = "XHamster_Video"
                         if title_match:
@@ -3101,16 +3323,12 @@ class QuikvidHandler(BaseHTTPRequestHandler):
                         print(f" [+] Attempting manual Eporner video URL extraction...")
                         progress.percent = 50.0
                         try:
-                            import requests
-                            import re
-
-                            # Get page content
-                            response = requests.get(
+                            # Get page content over the shared keep-alive client
+                            page_text = videoDownloader.fetch_page_text(
                                 progress.url,
-                                headers={
+                                {
                                     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
                                 },
-                                timeout=30,
                             )
 
                             # Extract video URL patterns
@@ -3123,7 +3341,7 @@ class QuikvidHandler(BaseHTTPRequestHandler):
                             video_url = None
                             for pattern in video_patterns:
                                 matches = re.findall(
-                                    pattern, response.text, re.IGNORECASE
+                                    pattern, page_text, re.IGNORECASE
                                 )
                                 if matches:
                                     video_url = matches[0]
@@ -3269,31 +3487,45 @@ class QuikvidHandler(BaseHTTPRequestHandler):
 
     def send_json_response(self, data, status=200):
         """Send JSON response with CORS headers."""
+        response_data = json.dumps(data, indent=2)
+        self.send_json_bytes(response_data.encode("utf-8"), status)
+
+    def send_json_bytes(self, body, status=200):
+        """Send an already encoded JSON body with CORS headers."""
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
         self.end_headers()
-
-        response_data = json.dumps(data, indent=2)
-        self.wfile.write(response_data.encode("utf-8"))
+        self.wfile.write(body)
 
     def send_html_response(self, html):
-        """Send HTML response."""
+        """Send HTML response; html may be a str or already encoded bytes."""
         self.send_response(200)
         self.send_header("Content-Type", "text/html")
         self.end_headers()
-        self.wfile.write(html.encode("utf-8"))
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+        self.wfile.write(html)
 
-    def get_web_interface(self):
-        """Get modern VidSnatch homepage interface."""
+    def get_web_interface_page(self):
+        """Get the homepage as UTF-8 bytes, rendering it once per active download count."""
         # Count only truly active downloads (preparing, downloading, processing)
-        active_count = sum(
-            1
-            for progress in active_downloads.values()
-            if progress.status in ["preparing", "downloading", "processing"]
-        )
+        with download_lock:
+            active_count = sum(
+                1
+                for progress in active_downloads.values()
+                if progress.status in ["preparing", "downloading", "processing"]
+            )
+        page = web_interface_pages.get(active_count)
+        if page is None:
+            page = self.get_web_interface(active_count).encode("utf-8")
+            web_interface_pages[active_count] = page
+        return page
+
+    def get_web_interface(self, active_count):
+        """Get modern VidSnatch homepage interface."""
         return f"""
         <!DOCTYPE html>
         <html lang="en">
@@ -7362,13 +7594,13 @@ def clean_stuck_downloads():
             progress.error = "Download stuck in preparing state"
 
             # Move to failed downloads
-            failed_downloads[download_id] = {
+            store_failed_download(download_id, {
                 "title": progress.title,
                 "url": progress.url,
                 "error": "Stuck in preparing state - cleaned up",
                 "retry_count": getattr(progress, "retry_count", 0),
                 "failed_at": current_time,
-            }
+            })
 
             del active_downloads[download_id]
 
@@ -7401,13 +7633,13 @@ def auto_retry_incomplete_downloads(handler_class):
             try:
                 # Create a failed download entry
                 download_id = str(uuid.uuid4())
-                failed_downloads[download_id] = {
+                store_failed_download(download_id, {
                     "title": url_data["title"],
                     "url": url_data["url"],
                     "error": "Download interrupted by server restart",
                     "retry_count": url_data.get("attempts", 0),
                     "failed_at": time.time(),
-                }
+                })
                 print(f" [!] Marked as failed: {url_data['title']}")
                 tracker.mark_failed(
                     url_track_id, "Server restart - marked for manual retry"
@@ -7419,10 +7651,18 @@ def auto_retry_incomplete_downloads(handler_class):
                 )
 
 
-def start_server(port=8080):
-    """Start the enhanced Quikvid-DL web server."""
+def start_server(port=8080, ready=None):
+    """Start the enhanced Quikvid-DL web server.
+
+    If ``ready`` is a threading.Event it is set once the server is accepting
+    connections.
+    """
+    install_missing_packages()
+
     server_address = ("0.0.0.0", port)
-    httpd = HTTPServer(server_address, QuikvidHandler)
+    # Each request gets its own (daemon) thread so progress polls don't queue
+    # behind slow handlers
+    httpd = ThreadingHTTPServer(server_address, QuikvidHandler)
 
     # Initialize URL tracker
     init_tracker(os.path.expanduser("~/Applications/VidSnatch/.logs/url_tracker.json"))
@@ -7457,9 +7697,31 @@ def start_server(port=8080):
     monitor_thread.daemon = True
     monitor_thread.start()
 
+    # Start writer thread for active downloads persistence
+    writer_thread = threading.Thread(target=active_downloads_writer)
+    writer_thread.daemon = True
+    writer_thread.start()
+
+    # Start writer thread for failed downloads persistence
+    failed_writer_thread = threading.Thread(target=failed_downloads_writer)
+    failed_writer_thread.daemon = True
+    failed_writer_thread.start()
+
+    # Write out anything the writer threads haven't saved yet on exit. SIGTERM
+    # (sent by the stop endpoint) would otherwise skip atexit handlers
+    atexit.register(write_active_downloads)
+    atexit.register(write_failed_downloads)
+    # Entry points that run the server on a worker thread install it themselves
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
     # Clean any currently stuck downloads immediately
     clean_stuck_downloads()
 
+    # The listening socket is bound in HTTPServer's constructor
+    if ready is not None:
+        ready.set()
+
     try:
         httpd.serve_forever()
     except KeyboardInterrupt: